@@ -282,7 +282,12 @@ def upsert_show(client: Client, tmdb_id:int, title:str, region:str, on_provider:
 
     # New show: insert, then run finale/cancellation detection from TMDB.
     client.table("shows").insert(data).execute()
-    show_status.update_show_status(client, user_id, tmdb_id, title)
+    # Just inserted: no prior status to compare against, so skip the re-read.
+    # The show is already saved — a failed status check must not break the add.
+    try:
+        show_status.update_show_status(client, user_id, tmdb_id, title, existing={})
+    except Exception as e:
+        print(f"Status check failed for {title}: {e}")
 
 def delete_show(client: Client, tmdb_id:int, region:str, provider_name:str):
     """Delete a show from the user's watchlist"""
@@ -297,7 +302,7 @@ def delete_show(client: Client, tmdb_id:int, region:str, provider_name:str):
 def list_shows(client: Client) -> List[Dict[str, Any]]:
     """Get all shows from the user's watchlist"""
     result = client.table("shows")\
-        .select("tmdb_id, title, region, on_provider, provider_name, next_air_date, overview, poster_path, production_status, status_message, status_confidence, in_production, created_at, show_status")\
+        .select("tmdb_id, title, region, on_provider, provider_name, next_air_date, overview, poster_path, production_status, status_message, status_confidence, in_production, created_at, show_status, last_status_check")\
         .eq("user_id", get_user_id())\
         .order("title")\
         .execute()
@@ -3308,11 +3313,13 @@ with col_spacer:
     st.write("")  # Spacing
 with col_bell:
     _bell_uid = get_user_id()
-    _unread = notifications.get_unread_count(client, _bell_uid)
+    # One round trip for both the badge count and the panel's rows
+    _bell_rows, _unread = notifications.get_notifications_with_unread(client, _bell_uid, limit=10)
     _bell_label = f"🔔 {_unread}" if _unread else "🔔"
     with st.popover(_bell_label, use_container_width=True,
                     help=f"{_unread} unread notification(s)" if _unread else "Notifications"):
-        notifications.render_notifications_panel(client, _bell_uid, key_prefix="hdr_")
+        notifications.render_notifications_panel(client, _bell_uid, key_prefix="hdr_",
+                                                 notifications=_bell_rows, unread_count=_unread)
 with col_gear:
     st.write("")  # Spacing
     show_settings = st.toggle(ICONS['settings'], value=False, help="Show/hide settings")
@@ -4441,7 +4448,8 @@ with _main_watch:
             if not row.get('production_status'):
                 try:
                     # Silently update status in background
-                    show_status.update_show_status(client, user_id, row['tmdb_id'], row['title'])
+                    show_status.update_show_status(client, user_id, row['tmdb_id'], row['title'],
+                                                   existing=row)
                 except Exception:
                     pass  # Silently fail, don't interrupt display
         # Refresh rows after updates
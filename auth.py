@@ -7,6 +7,7 @@ import streamlit as st
 from supabase import Client
 from typing import Optional, Dict, Any
 import logging
+import notifications
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +140,8 @@ def ensure_user_record(client: Client, user_id: str, email: Optional[str]) -> bo
             "email": email,
             "username": (email or "user").split('@')[0] or "user",
         }, on_conflict="id").execute()
+        # The email may have just changed — don't keep sending to a cached old address
+        notifications.forget_user_email(user_id)
         return True
     except Exception as e:
         print(f"ensure_user_record warning: {e}")
@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 """
 StreamGenie scheduled-jobs runner — invoked by GitHub Actions cron, NOT the in-app
-APScheduler (which only runs while the Streamlit app is awake on Streamlit Cloud).
+scheduler (which only runs while the Streamlit app is awake on Streamlit Cloud).
 
 Jobs:
   daily    — email/notify shows airing today          (reuses scheduled_tasks)
   leaving  — alert users when a watchlist title is <= N days from leaving a provider
   status   — refresh TMDB status; notify on Ended/Canceled (reuses show_status)
   weekly   — weekly preview email (runs only on Sundays when job=all)
+  prune    — delete bell notifications older than 90 days (retention)
 
 Env required: SUPABASE_URL, SUPABASE_KEY (service_role/secret), TMDB_API_KEY,
               SENDGRID_API_KEY, SENDGRID_FROM_EMAIL
-Usage: python cron_runner.py [--job all|daily|leaving|status|weekly]
+Usage: python cron_runner.py [--job all|daily|leaving|status|weekly|prune]
                              [--leaving-window 7] [--dry-run]
 """
 import os
@@ -29,6 +30,9 @@ import show_status
 import leaving_soon
 
 
+PRUNE_DAYS = 90  # bell-notification retention
+
+
 def log(m: str) -> None:
     print(f"[{dt.datetime.now(dt.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}Z] {m}", flush=True)
 
@@ -43,7 +47,7 @@ def get_client():
 
 
 def _bare_scheduler(client):
-    """A TaskScheduler with its client set but WITHOUT starting APScheduler
+    """A TaskScheduler with its client set but WITHOUT its scheduler state
     (we only want the job-body methods, not a background thread)."""
     ts = scheduled_tasks.TaskScheduler.__new__(scheduled_tasks.TaskScheduler)
     ts.client = client
@@ -120,24 +124,32 @@ def run_leaving(client, window_days: int, dry: bool):
 
 def run_status(client, dry: bool):
     log("JOB status: TMDB status sweep (notifies on Ended/Canceled)")
-    users = client.table("users").select("id").execute().data or []
     if dry:
+        users = client.table("users").select("id").execute().data or []
         n = client.table("shows").select("tmdb_id").execute().data or []
         log(f"  [dry-run] would sweep {len(n)} show rows across {len(users)} users "
             "(notifications only fire on a status change to Ended/Canceled)")
         return
-    changed = 0
-    for u in users:
-        stats = show_status.check_all_shows_status(client, u["id"])
-        changed += stats.get("updated", 0)
-    log(f"  status: {changed} status change(s) across {len(users)} users")
+    # One shows query for everyone; each TMDB id fetched once, not once per watcher
+    stats = show_status.check_all_users_shows_status(client)
+    log(f"  status: {stats.get('updated', 0)} status change(s) across "
+        f"{stats.get('total', 0)} show rows ({stats.get('errors', 0)} error(s))")
+
+
+def run_prune(client, dry: bool):
+    log(f"JOB prune: notifications older than {PRUNE_DAYS} days")
+    if dry:
+        log("  [dry-run] would delete them")
+        return
+    ok = notifications.prune_old_notifications(client, days=PRUNE_DAYS)
+    log(f"  prune: {'done' if ok else 'FAILED'}")
 
 
 # ---------------- main ----------------
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--job", default="all",
-                    choices=["all", "daily", "leaving", "status", "weekly"])
+                    choices=["all", "daily", "leaving", "status", "weekly", "prune"])
     ap.add_argument("--leaving-window", type=int, default=7)
     ap.add_argument("--dry-run", action="store_true")
     args = ap.parse_args()
@@ -153,6 +165,8 @@ def main():
         run_leaving(client, args.leaving_window, dry)
     if job in ("all", "status"):
         run_status(client, dry)
+    if job in ("all", "prune"):
+        run_prune(client, dry)
     # weekly preview: explicit --job weekly, or Sundays under --job all
     if job == "weekly" or (job == "all" and dt.date.today().weekday() == 6):
         run_weekly(client, dry)
@@ -0,0 +1,27 @@
+-- Mark notifications read with the DATABASE clock instead of a client timestamp.
+-- notifications.mark_notification_read / mark_all_notifications_read call these via
+-- client.rpc(...) — no ISO string in the payload and nothing returned but void.
+-- Until this runs, the Python side falls back to the old PostgREST update.
+-- SECURITY INVOKER (the default), so the notifications RLS policies still apply.
+-- Idempotent / safe to re-run.
+--
+-- Run at: https://supabase.com/dashboard/project/mqiulsjmizygkaompypu/sql/new
+
+CREATE OR REPLACE FUNCTION mark_read(notif_id uuid)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE notifications
+     SET is_read = true, read_at = now()
+   WHERE id = notif_id;
+$$;
+
+CREATE OR REPLACE FUNCTION mark_all_read(p_user_id uuid)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE notifications
+     SET is_read = true, read_at = now()
+   WHERE user_id = p_user_id
+     AND is_read = false;
+$$;
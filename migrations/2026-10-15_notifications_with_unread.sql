@@ -0,0 +1,36 @@
+-- Bell panel in ONE round trip: the latest notifications plus the unread badge count.
+-- notifications.get_notifications_with_unread() reads unread_count from the first row
+-- (no rows → 0 unread). Falls back to two queries until this runs.
+-- SECURITY INVOKER (the default), so the notifications RLS policies still apply.
+-- Idempotent / safe to re-run.
+--
+-- Run at: https://supabase.com/dashboard/project/mqiulsjmizygkaompypu/sql/new
+
+CREATE OR REPLACE FUNCTION get_notifications_with_unread(p_user_id uuid, p_limit integer)
+RETURNS TABLE (
+  id uuid,
+  user_id uuid,
+  notification_type text,
+  title text,
+  message text,
+  related_show_id integer,
+  related_show_title text,
+  is_read boolean,
+  sent_email boolean,
+  created_at timestamptz,
+  read_at timestamptz,
+  unread_count bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT n.id, n.user_id, n.notification_type, n.title, n.message,
+         n.related_show_id, n.related_show_title, n.is_read, n.sent_email,
+         n.created_at, n.read_at,
+         (SELECT count(*) FROM notifications u
+           WHERE u.user_id = p_user_id AND u.is_read = false) AS unread_count
+    FROM notifications n
+   WHERE n.user_id = p_user_id
+   ORDER BY n.created_at DESC
+   LIMIT p_limit;
+$$;
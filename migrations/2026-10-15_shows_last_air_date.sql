@@ -0,0 +1,10 @@
+-- Store TMDB's last_air_date on each show row so show_status.is_series_finale can
+-- answer from the database (show_status + last_air_date) without a TMDB call.
+-- update_show_status / check_all_shows_status write it on every status check;
+-- rows checked before this runs fall back to a (cached) TMDB lookup until then.
+-- Run BEFORE deploying the code that writes it.
+-- Idempotent / safe to re-run.
+--
+-- Run at: https://supabase.com/dashboard/project/mqiulsjmizygkaompypu/sql/new
+
+ALTER TABLE shows ADD COLUMN IF NOT EXISTS last_air_date DATE;
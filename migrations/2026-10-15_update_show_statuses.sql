@@ -0,0 +1,43 @@
+-- Write a whole status sweep in ONE round trip and one transaction.
+-- show_status._check_rows() sends the batch as a jsonb array of shows-row fields
+-- (user_id, tmdb_id, show_status, production_status, ...) via client.rpc(...);
+-- the check timestamps come from the database clock. Rows that aren't on a
+-- watchlist are ignored (UPDATE only). web_intel is kept when the batch omits it.
+-- Until this runs, the Python side falls back to the bulk upsert.
+-- Returns rows updated.
+-- Idempotent / safe to re-run.
+--
+-- Run at: https://supabase.com/dashboard/project/mqiulsjmizygkaompypu/sql/new
+
+CREATE OR REPLACE FUNCTION update_show_statuses(p jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE n integer;
+BEGIN
+  UPDATE shows s
+     SET show_status       = x.show_status,
+         production_status = x.production_status,
+         status_confidence = x.status_confidence,
+         status_message    = x.status_message,
+         in_production     = x.in_production,
+         last_air_date     = x.last_air_date,
+         web_intel         = COALESCE(x.web_intel, s.web_intel),
+         last_status_check = now(),
+         last_intel_check  = now()
+    FROM jsonb_to_recordset(p) AS x(
+           user_id uuid,
+           tmdb_id integer,
+           show_status text,
+           production_status text,
+           status_confidence text,
+           status_message text,
+           in_production boolean,
+           last_air_date date,
+           web_intel text)
+   WHERE s.user_id = x.user_id
+     AND s.tmdb_id = x.tmdb_id;
+
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END $$;
@@ -16,14 +16,20 @@ Race-proof: an atomic claim on the notifications table (weekly_digest + week key
 means only one app instance ever sends a given user's newsletter for a given week.
 """
 import datetime as dt
+import html
 import os
 from collections import defaultdict
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
+from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 import genie
 import mailer
+import paging
 import preferences
 import leaving_soon as leaving_mod
 import sports
@@ -31,25 +37,44 @@ import sports
 TMDB_API_KEY = os.getenv("TMDB_API_KEY", "").strip()
 TMDB_BASE = "https://api.themoviedb.org/3"
 
+# Keep-alive TMDB session — a weekly run makes ~20 TMDB calls per user
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])))
+
 
 def _tmdb(path: str, **params) -> Dict[str, Any]:
     params.update(api_key=TMDB_API_KEY, language="en-US")
-    r = requests.get(f"{TMDB_BASE}{path}", params=params, timeout=15)
+    r = _SESSION.get(f"{TMDB_BASE}{path}", params=params, timeout=15)
     r.raise_for_status()
     return r.json()
 
 
 # ---------------- section builders ----------------
 
-def build_sections(client, user_id: str) -> Dict[str, Any]:
-    """Gather all newsletter sections for one user. Each section may be empty."""
+def _watchlists_by_user(client) -> Dict[str, List[Dict[str, Any]]]:
+    """Every user's watchlist rows in one paged query (ordered by id for stable
+    pages), grouped by user_id — replaces a shows query per user."""
+    by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for r in paging.fetch_all(lambda: client.table("shows")
+                              .select("user_id,tmdb_id,title,provider_name,next_air_date")):
+        by_user[r["user_id"]].append(r)
+    return by_user
+
+
+def build_sections(client, user_id: str,
+                   rows: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Gather all newsletter sections for one user. Each section may be empty.
+    `rows` = the user's shows rows if the caller already has them."""
     today = dt.date.today()
     week_end = today + dt.timedelta(days=7)
     t_iso, w_iso = today.isoformat(), week_end.isoformat()
 
-    rows = client.table("shows")\
-        .select("tmdb_id,title,provider_name,next_air_date")\
-        .eq("user_id", user_id).execute().data or []
+    if rows is None:
+        rows = client.table("shows")\
+            .select("tmdb_id,title,provider_name,next_air_date")\
+            .eq("user_id", user_id).execute().data or []
     tv = [r for r in rows if (r.get("tmdb_id") or 0) > 0]
     sports_rows = [r for r in rows if (r.get("tmdb_id") or 0) < 0]
     wl_ids = {r["tmdb_id"] for r in tv}
@@ -168,10 +193,10 @@ def build_sections(client, user_id: str) -> Dict[str, Any]:
 
 def build_chat_context(client, user_id: str) -> Dict[str, Any]:
     """Sections + full watchlist/follows — the grounding context for Ask Genie."""
-    s = build_sections(client, user_id)
     rows = client.table("shows")\
         .select("tmdb_id,title,provider_name,next_air_date")\
         .eq("user_id", user_id).execute().data or []
+    s = build_sections(client, user_id, rows=rows)
     s["watchlist"] = [
         {"tmdb_id": r["tmdb_id"], "title": r["title"],
          "app": (r.get("provider_name") or None),
@@ -187,7 +212,10 @@ def build_chat_context(client, user_id: str) -> Dict[str, Any]:
 
 # ---------------- rendering ----------------
 
+@lru_cache(maxsize=512)
 def _day(date_str: str) -> str:
+    """'2026-06-07' → 'Sun Jun 7'. Memoized: every user's email in a weekly run
+    labels the same handful of dates, so each is parsed/formatted once per job."""
     try:
         return dt.date.fromisoformat(date_str).strftime("%a %b %-d")
     except Exception:
@@ -209,14 +237,19 @@ def _section(title: str, body: str) -> str:
 
 
 def render_html(s: Dict[str, Any], editorial: Optional[Dict[str, Any]] = None) -> str:
+    """Build the newsletter HTML. Every external string (TMDB/ESPN titles, provider
+    names, Genie's text) is HTML-escaped. Per-email constants are resolved once
+    up front rather than once per row."""
+    esc = html.escape
     blocks = []
     editorial = editorial or {}
     rec_blurbs = editorial.get("rec_blurbs") or {}
+    base = os.getenv("APP_BASE_URL", "https://streamgenie-estero.streamlit.app").rstrip("/")
 
     if editorial.get("intro"):
         blocks.append(f"""
       <div style="background:white;padding:16px 20px;border-radius:8px;margin:14px 0;border-left:4px solid #667eea;">
-        <p style="margin:0;color:#444;font-size:15px;line-height:1.6;font-style:italic;">{editorial['intro']}</p>
+        <p style="margin:0;color:#444;font-size:15px;line-height:1.6;font-style:italic;">{esc(editorial['intro'])}</p>
         <p style="margin:6px 0 0;color:#aaa;font-size:12px;">— Genie, your AI streaming assistant</p>
       </div>""")
 
@@ -224,7 +257,7 @@ def render_html(s: Dict[str, Any], editorial: Optional[Dict[str, Any]] = None) -
         by_day = defaultdict(list)
         for r in s["airing"]:
             prov = (r.get("provider_name") or "").strip()
-            label = f"<b>{r['title']}</b>" + (f" — {prov}" if prov and prov != "Multiple Providers" else "")
+            label = f"<b>{esc(r['title'])}</b>" + (f" — {esc(prov)}" if prov and prov != "Multiple Providers" else "")
             by_day[r["next_air_date"]].append(label)
         body = "".join(
             f'<p style="margin:8px 0 2px;color:#667eea;font-weight:bold;font-size:14px;">{_day(d)}</p>'
@@ -233,38 +266,36 @@ def render_html(s: Dict[str, Any], editorial: Optional[Dict[str, Any]] = None) -
 
     if s["highlights"]:
         blocks.append(_section("🎭 Premieres &amp; Finales", _rows([
-            f"<b>{h['title']}</b> — {h['tag']} on {_day(h['date'])}"
-            + (f" ({h['provider']})" if h.get("provider") else "")
+            f"<b>{esc(h['title'])}</b> — {h['tag']} on {_day(h['date'])}"
+            + (f" ({esc(h['provider'])})" if h.get("provider") else "")
             for h in s["highlights"]])))
 
     if s["games"]:
         blocks.append(_section("🏈 Sports This Week", _rows([
-            (f"{_day(g['date'])} · {g['league']}: " if g.get("league") else f"{_day(g['date'])}: ")
-            + f"<b>{g['matchup']}</b>"
-            + (f" — {g['network']}" if g.get("network") else "")
+            (f"{_day(g['date'])} · {esc(g['league'])}: " if g.get("league") else f"{_day(g['date'])}: ")
+            + f"<b>{esc(g['matchup'])}</b>"
+            + (f" — {esc(g['network'])}" if g.get("network") else "")
             for g in s["games"]])))
 
     if s["leaving"]:
         blocks.append(_section("⏳ Leaving Soon", _rows([
-            f"<b>{e.get('title')}</b> leaves {e.get('provider_name')} "
+            f"<b>{esc(str(e.get('title')))}</b> leaves {esc(str(e.get('provider_name')))} "
             f"{_day(str(e.get('leaving_date')))} ({e.get('_days_left', '?')} days left)"
             for e in s["leaving"]])))
 
     if s["recs"]:
         def _rec_line(r):
-            line = (f"<b>{r['title']}</b> — rated {r['vote']:.1f}/10 "
-                    f"(because you watch {r['seed']})")
+            parts = [f"<b>{esc(r['title'])}</b> — rated {r['vote']:.1f}/10 "
+                     f"(because you watch {esc(r['seed'])})"]
             blurb = rec_blurbs.get((r.get("title") or "").strip().lower())
             if blurb:
-                line += (f'<br><span style="color:#888;font-size:13px;'
-                         f'font-style:italic;">Genie says: {blurb}</span>')
+                parts.append(f'<br><span style="color:#888;font-size:13px;'
+                             f'font-style:italic;">Genie says: {esc(blurb)}</span>')
             # 👍/👎 — one click teaches Genie; handled by the app via query params
-            base = os.getenv("APP_BASE_URL", "https://streamgenie-estero.streamlit.app").rstrip("/")
-            from urllib.parse import quote
             q = f"rec_title={quote(r['title'])}&rec_id={r.get('tmdb_id') or ''}"
-            line += (f'<br><a href="{base}/?rec_vote=up&{q}" style="text-decoration:none;font-size:14px;">👍 More like this</a>'
-                     f'&nbsp;&nbsp;<a href="{base}/?rec_vote=down&{q}" style="text-decoration:none;font-size:14px;">👎 Not for me</a>')
-            return line
+            parts.append(f'<br><a href="{base}/?rec_vote=up&{q}" style="text-decoration:none;font-size:14px;">👍 More like this</a>'
+                         f'&nbsp;&nbsp;<a href="{base}/?rec_vote=down&{q}" style="text-decoration:none;font-size:14px;">👎 Not for me</a>')
+            return "".join(parts)
         blocks.append(_section("✨ Recommended For You", _rows(
             [_rec_line(r) for r in s["recs"]])))
 
@@ -318,13 +349,18 @@ def send_weekly_newsletters(client, log=print) -> int:
 
     week_key = dt.date.today().isoformat()
     users = client.table("users").select("id,email").execute().data or []
+    watchlists = _watchlists_by_user(client)
     sent = 0
     for u in users:
         uid, email = u["id"], (u.get("email") or "").strip()
         if not email:
             continue
+        # Empty watchlist → every section is empty; skip without building
+        if not watchlists.get(uid):
+            log(f"newsletter: nothing happening for {email}, skipping")
+            continue
         try:
-            s = build_sections(client, uid)
+            s = build_sections(client, uid, rows=watchlists[uid])
         except Exception as e:
             log(f"newsletter: build failed for {uid[:8]}: {e}")
             continue
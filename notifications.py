@@ -4,10 +4,11 @@ Handles in-app notifications, email notifications, and realtime updates
 """
 import streamlit as st
 from supabase import Client
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta
 import html
 import mailer
+import paging
 import os
 import preferences  # User notification preferences
 
@@ -105,21 +106,48 @@ def create_notification(
         return False
 
 
+# users.email memoized per process: a fan-out of N sends costs one lookup per distinct
+# user instead of N. auth.ensure_user_record re-syncs the email on every login and
+# calls forget_user_email, so a changed address is re-read on the next send.
+_USER_EMAILS: Dict[str, str] = {}
+_USER_EMAILS_MAX = 10000
+
+
+def _get_user_email(client: Client, user_id: str) -> str:
+    """users.email for a user, cached in _USER_EMAILS.
+    Misses raise LookupError (and so aren't cached)."""
+    email = _USER_EMAILS.get(user_id)
+    if email is None:
+        result = client.table("users").select("email").eq("id", user_id).execute()
+        if not result.data or not result.data[0].get("email"):
+            raise LookupError(user_id)
+        if len(_USER_EMAILS) >= _USER_EMAILS_MAX:
+            _USER_EMAILS.clear()
+        email = _USER_EMAILS[user_id] = result.data[0]["email"]
+    return email
+
+
+def forget_user_email(user_id: str):
+    """Drop a user's cached email (after it may have changed)"""
+    _USER_EMAILS.pop(user_id, None)
+
+
 def send_notification_email(
     client: Client,
     user_id: str,
     title: str,
     message: str,
-    show_title: Optional[str] = None
+    show_title: Optional[str] = None,
+    user_email: Optional[str] = None
 ):
-    """Send notification via email using SendGrid"""
+    """Send notification via email using SendGrid.
+    Pass user_email when the caller already has it (e.g. from a bulk users query)."""
     try:
-        # Get user email
-        result = client.table("users").select("email").eq("id", user_id).execute()
-        if not result.data:
-            return
-
-        user_email = result.data[0]["email"]
+        if not user_email:
+            try:
+                user_email = _get_user_email(client, user_id)
+            except LookupError:
+                return
 
         # Email transport configured? (SMTP via mailer — Postmark/Gmail/etc.)
         if not mailer.is_configured():
@@ -212,12 +240,16 @@ def get_user_notifications(
 
 
 def mark_notification_read(client: Client, notification_id: str) -> bool:
-    """Mark a notification as read"""
+    """Mark a notification as read (read_at stamped by Postgres now())"""
     try:
-        client.table("notifications")\
-            .update({"is_read": True, "read_at": datetime.now().isoformat()})\
-            .eq("id", notification_id)\
-            .execute()
+        try:
+            client.rpc("mark_read", {"notif_id": notification_id}).execute()
+        except Exception:
+            # RPC not created yet (migrations/2026-10-15_notifications_mark_read.sql)
+            client.table("notifications")\
+                .update({"is_read": True, "read_at": datetime.now().isoformat()})\
+                .eq("id", notification_id)\
+                .execute()
         return True
     except Exception as e:
         print(f"Error marking notification as read: {e}")
@@ -225,13 +257,16 @@ def mark_notification_read(client: Client, notification_id: str) -> bool:
 
 
 def mark_all_notifications_read(client: Client, user_id: str) -> bool:
-    """Mark all notifications for a user as read"""
+    """Mark all notifications for a user as read (one RPC, returns nothing)"""
     try:
-        client.table("notifications")\
-            .update({"is_read": True, "read_at": datetime.now().isoformat()})\
-            .eq("user_id", user_id)\
-            .eq("is_read", False)\
-            .execute()
+        try:
+            client.rpc("mark_all_read", {"p_user_id": user_id}).execute()
+        except Exception:
+            client.table("notifications")\
+                .update({"is_read": True, "read_at": datetime.now().isoformat()})\
+                .eq("user_id", user_id)\
+                .eq("is_read", False)\
+                .execute()
         return True
     except Exception as e:
         print(f"Error marking all notifications as read: {e}")
@@ -251,6 +286,36 @@ def delete_notification(client: Client, notification_id: str) -> bool:
         return False
 
 
+def delete_notifications_bulk(client: Client, ids: List[str]) -> int:
+    """Delete many notifications with IN-clause deletes instead of one call per id.
+    Chunked so the id list stays well inside PostgREST's URL limit. Returns the
+    number deleted (chunks done before an error still count)."""
+    deleted = 0
+    try:
+        for i in range(0, len(ids), 50):
+            chunk = ids[i:i+50]
+            client.table("notifications").delete().in_("id", chunk).execute()
+            deleted += len(chunk)
+        return deleted
+    except Exception as e:
+        print(f"Error bulk-deleting notifications: {e}")
+        return deleted  # chunks already deleted stay deleted
+
+
+def prune_old_notifications(client: Client, days: int = 90) -> bool:
+    """TTL cleanup: drop every notification older than `days` in a single delete."""
+    try:
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        client.table("notifications")\
+            .delete()\
+            .lt("created_at", cutoff)\
+            .execute()
+        return True
+    except Exception as e:
+        print(f"Error pruning old notifications: {e}")
+        return False
+
+
 def get_unread_count(client: Client, user_id: str) -> int:
     """Get count of unread notifications"""
     try:
@@ -265,11 +330,38 @@ def get_unread_count(client: Client, user_id: str) -> int:
         return 0
 
 
-def render_notifications_panel(client: Client, user_id: str, key_prefix: str = ""):
+def get_notifications_with_unread(
+    client: Client,
+    user_id: str,
+    limit: int = 10
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Latest notifications AND the unread count in a single round trip.
+
+    Uses the get_notifications_with_unread RPC (unread_count rides on every row);
+    falls back to get_unread_count + get_user_notifications if it isn't deployed.
+    """
+    try:
+        result = client.rpc("get_notifications_with_unread", {
+            "p_user_id": user_id,
+            "p_limit": limit
+        }).execute()
+        rows = result.data or []
+        return rows, (rows[0].get("unread_count") or 0) if rows else 0
+    except Exception:
+        return (get_user_notifications(client, user_id, unread_only=False, limit=limit),
+                get_unread_count(client, user_id))
+
+
+def render_notifications_panel(client: Client, user_id: str, key_prefix: str = "",
+                               notifications: Optional[List[Dict[str, Any]]] = None,
+                               unread_count: Optional[int] = None):
     """Render the notifications list (header, mark-all, items) into the current container.
     Container-agnostic so it works in the sidebar OR a header popover. key_prefix keeps
-    widget keys unique when the panel is rendered in more than one place."""
-    unread_count = get_unread_count(client, user_id)
+    widget keys unique when the panel is rendered in more than one place.
+    Pass notifications + unread_count (from get_notifications_with_unread) when the
+    caller already fetched them, e.g. for the bell label; otherwise they're read here."""
+    if notifications is None or unread_count is None:
+        notifications, unread_count = get_notifications_with_unread(client, user_id, limit=10)
 
     # Notifications header with badge
     col1, col2 = st.columns([3, 1])
@@ -279,8 +371,6 @@ def render_notifications_panel(client: Client, user_id: str, key_prefix: str = "
         if unread_count > 0:
             st.markdown(f"<span style='background-color: #ff4b4b; color: white; padding: 4px 8px; border-radius: 12px; font-size: 12px; font-weight: bold;'>{unread_count}</span>", unsafe_allow_html=True)
 
-    notifications = get_user_notifications(client, user_id, unread_only=False, limit=10)
-
     if not notifications:
         st.info("No notifications yet")
         return
@@ -395,6 +485,27 @@ def notify_new_episode(
     )
 
 
+def airing_digest_fields(shows: list) -> Dict[str, Any]:
+    """Notification fields for ONE consolidated "airing today" digest of `shows`
+    (rows from the shows table: title, provider_name, next_air_date)."""
+    def _label(s):
+        p = (s.get("provider_name") or "").strip()
+        return f"{s['title']} ({p})" if p and p != "Multiple Providers" else s["title"]
+
+    air_date = shows[0].get("next_air_date", "")
+    n = len(shows)
+    return {
+        "notification_type": "new_episode",
+        "title": "New Episode Today" if n == 1 else f"{n} Shows Airing Today",
+        "message": f"New episode{'s' if n > 1 else ''} on {air_date}: " +
+                   ", ".join(_label(s) for s in shows),
+        # Sentinel 0 (not NULL): the dedup unique index treats NULLs as distinct,
+        # so NULL digests race past it — a real value makes the atomic claim work.
+        "related_show_id": 0,
+        "related_show_title": ", ".join(s["title"] for s in shows),
+    }
+
+
 def notify_airing_digest(client: Client, user_id: str, shows: list):
     """ONE consolidated in-app notification for all of a user's shows airing today.
 
@@ -402,31 +513,70 @@ def notify_airing_digest(client: Client, user_id: str, shows: list):
     email surface; day-of nudges live in the notification bell.
     `shows` are rows from the shows table (title, provider_name, next_air_date).
     Only called on days when something actually airs — no empty digests.
+    The daily job posts every user's digest at once via create_notifications_bulk.
     """
     if not shows:
         return
 
-    def _label(s):
-        p = (s.get("provider_name") or "").strip()
-        return f"{s['title']} ({p})" if p and p != "Multiple Providers" else s["title"]
-
-    air_date = shows[0].get("next_air_date", "")
-    n = len(shows)
     create_notification(
         client=client,
         user_id=user_id,
-        notification_type="new_episode",
-        title="New Episode Today" if n == 1 else f"{n} Shows Airing Today",
-        message=f"New episode{'s' if n > 1 else ''} on {air_date}: " +
-                ", ".join(_label(s) for s in shows),
-        # Sentinel 0 (not NULL): the dedup unique index treats NULLs as distinct,
-        # so NULL digests race past it — a real value makes the atomic claim work.
-        related_show_id=0,
-        related_show_title=", ".join(s["title"] for s in shows),
-        send_email=False  # weekly newsletter is the only email
+        send_email=False,  # weekly newsletter is the only email
+        **airing_digest_fields(shows)
     )
 
 
+def create_notifications_bulk(client: Client, rows: List[Dict[str, Any]]) -> int:
+    """Insert many in-app notifications in one request per 500 rows (bell only, no email).
+
+    Same atomic claim as create_notification: upsert+ignore_duplicates against
+    notifications_dedup_idx, so rows that already exist are skipped. Callers apply
+    user preferences first. Returns the number of rows actually inserted.
+    """
+    # PostgREST bulk inserts need every row to carry the same keys
+    rows = [{"related_show_id": None, "related_show_title": None, "sent_email": False, **r}
+            for r in rows]
+    inserted = 0
+    try:
+        for i in range(0, len(rows), 500):
+            chunk = rows[i:i+500]
+            try:
+                ins = client.table("notifications").upsert(
+                    chunk,
+                    on_conflict="user_id,notification_type,related_show_id,message",
+                    ignore_duplicates=True
+                ).execute()
+            except Exception:
+                # Unique index not created yet → drop rows that already exist, plain insert.
+                # The pre-read is narrowed to the chunk's types/shows and paged, since
+                # PostgREST caps a response at 1000 rows and a partial set lets dupes in.
+                show_ids = {r["related_show_id"] for r in chunk}
+                user_ids = list({r["user_id"] for r in chunk})
+                seen = set()
+                for j in range(0, len(user_ids), 200):  # keep the IN list URL-sized
+                    def existing_query(users=user_ids[j:j+200]):
+                        q = client.table("notifications")\
+                            .select("user_id,notification_type,related_show_id,message")\
+                            .in_("user_id", users)\
+                            .in_("notification_type", list({r["notification_type"] for r in chunk}))
+                        if None not in show_ids:  # IN never matches NULL
+                            q = q.in_("related_show_id", list(show_ids))
+                        return q
+                    seen.update((e["user_id"], e["notification_type"], e["related_show_id"], e["message"])
+                                for e in paging.fetch_all(existing_query))
+                chunk = [r for r in chunk
+                         if (r["user_id"], r["notification_type"], r["related_show_id"], r["message"])
+                         not in seen]
+                if not chunk:
+                    continue
+                ins = client.table("notifications").insert(chunk).execute()
+            inserted += len(ins.data or [])
+        return inserted
+    except Exception as e:
+        print(f"Error bulk-creating notifications: {e}")
+        return inserted
+
+
 def expire_stale_airing(client: Client) -> int:
     """Delete airing notifications whose air date has passed — the episodes now
     live in Catch Up, so the bell shouldn't keep announcing them. Returns count."""
@@ -439,9 +589,7 @@ def expire_stale_airing(client: Client) -> int:
         stale = [x["id"] for x in rows
                  if (m := _re.search(r"(\d{4}-\d{2}-\d{2})", x.get("message") or ""))
                  and m.group(1) < today]
-        for i in range(0, len(stale), 50):
-            client.table("notifications").delete().in_("id", stale[i:i+50]).execute()
-        return len(stale)
+        return delete_notifications_bulk(client, stale)
     except Exception as e:
         print(f"Error expiring stale notifications: {e}")
         return 0
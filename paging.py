@@ -0,0 +1,31 @@
+"""
+Paged Supabase reads
+PostgREST caps every response (1000 rows by default), so a read that can outgrow
+that has to walk .range() pages over a stable order or it silently comes back short.
+"""
+from typing import Any, Callable, Dict, List
+
+PAGE_SIZE = 1000
+
+
+def fetch_all(build_query: Callable[[], Any], order: str = "id",
+              page_size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Every row a query matches, one request per page
+
+    Args:
+        build_query: Returns a FRESH filtered builder (client.table(...).select(...)...)
+            each call — builders accumulate params, so one can't be re-ranged
+        order: Column that gives the pages a stable order
+        page_size: Rows per request (at most the PostgREST cap)
+
+    Returns:
+        All matching rows
+    """
+    rows, start = [], 0
+    while True:
+        page = build_query().order(order).range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
@@ -3,7 +3,7 @@ Notification Preferences Management
 Handles user preferences for email and in-app notifications
 """
 from supabase import Client
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +36,32 @@ def get_user_preferences(client: Client, user_id: str) -> Optional[Dict]:
         return None
 
 
+def get_preferences_bulk(client: Client, user_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Get notification preferences for many users in one query per 200 ids
+
+    Args:
+        client: Supabase client
+        user_ids: User UUIDs
+
+    Returns:
+        Dictionary of user_id -> preferences. Users without a preferences row
+        are absent (callers apply the defaults, same as should_create_inapp_notification)
+    """
+    prefs = {}
+    try:
+        for i in range(0, len(user_ids), 200):
+            result = client.table("notification_preferences")\
+                .select("*")\
+                .in_("user_id", user_ids[i:i+200])\
+                .execute()
+            for row in result.data or []:
+                prefs[row["user_id"]] = row
+    except Exception as e:
+        logger.error(f"Error getting bulk user preferences: {e}")
+    return prefs
+
+
 def create_default_preferences(client: Client, user_id: str) -> Dict:
     """
     Create default notification preferences for a new user
@@ -208,29 +234,43 @@ def should_create_inapp_notification(client: Client, user_id: str, notification_
     """
     try:
         prefs = get_or_create_preferences(client, user_id)
+        return inapp_allowed(prefs, notification_type)
+    except Exception as e:
+        logger.error(f"Error checking in-app preference: {e}")
+        return True  # Default to showing notifications on error
 
-        # Map notification types to preference keys
-        type_mapping = {
-            "new_episode": "inapp_new_episodes",
-            "new_episodes": "inapp_new_episodes",
-            "reminder": "inapp_new_episodes",       # daily "airs today" reminder
-            "weekly_preview": "inapp_weekly_preview",
-            "series_finale": "inapp_series_finale",
-            "series_cancelled": "inapp_series_cancelled",
-            "show_added": "inapp_show_added",
-            "status_change": "inapp_show_added",
-            "leaving_soon": "inapp_leaving_soon",
-            "renewed": "inapp_series_finale",       # show-status news bucket
-            "no_return": "inapp_show_added",
-        }
 
-        pref_key = type_mapping.get(notification_type, None)
+# Map notification types to in-app preference keys
+_INAPP_TYPE_MAPPING = {
+    "new_episode": "inapp_new_episodes",
+    "new_episodes": "inapp_new_episodes",
+    "reminder": "inapp_new_episodes",       # daily "airs today" reminder
+    "weekly_preview": "inapp_weekly_preview",
+    "series_finale": "inapp_series_finale",
+    "series_cancelled": "inapp_series_cancelled",
+    "show_added": "inapp_show_added",
+    "status_change": "inapp_show_added",
+    "leaving_soon": "inapp_leaving_soon",
+    "renewed": "inapp_series_finale",       # show-status news bucket
+    "no_return": "inapp_show_added",
+}
 
-        if pref_key is None:
-            # Unknown type, default to creating notification
-            return True
 
-        return prefs.get(pref_key, True)
-    except Exception as e:
-        logger.error(f"Error checking in-app preference: {e}")
-        return True  # Default to showing notifications on error
+def inapp_allowed(prefs: Optional[Dict], notification_type: str) -> bool:
+    """
+    In-app preference check against an already-loaded preferences row
+
+    Args:
+        prefs: Preferences dictionary (None = no row yet = defaults)
+        notification_type: Type of notification
+
+    Returns:
+        True if in-app notification should be created, False otherwise
+    """
+    pref_key = _INAPP_TYPE_MAPPING.get(notification_type, None)
+
+    if pref_key is None:
+        # Unknown type, default to creating notification
+        return True
+
+    return (prefs or {}).get(pref_key, True)
@@ -4,16 +4,91 @@ Enhanced show status tracking with web search and AI analysis
 Helps distinguish between dead shows vs shows in production
 """
 import os
+import re
+import time
+import threading
 import requests
+from concurrent.futures import Future
 from typing import Optional, Dict, Tuple
 from datetime import datetime, date
+from enum import IntEnum
+from functools import lru_cache
 import logging
 
+try:
+    import ahocorasick  # optional (pip install pyahocorasick): one-pass keyword scan
+except ImportError:
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY", "").strip()
 TMDB_BASE = "https://api.themoviedb.org/3"
 
+# parse_web_search_results keywords (order = order reported back to callers)
+_POSITIVE_KEYWORDS = (
+    "renewed", "filming", "production", "scheduled", "confirmed",
+    "greenlit", "announced", "in development", "pre-production",
+    "shooting", "principal photography", "wrapping", "post-production"
+)
+_NEGATIVE_KEYWORDS = (
+    "canceled", "cancelled", "axed", "not renewed", "no season",
+    "final season", "series finale", "concluded", "ended"
+)
+_POSITIVE_SET = frozenset(_POSITIVE_KEYWORDS)
+_NEGATIVE_SET = frozenset(_NEGATIVE_KEYWORDS)
+# Only the phrases are matched; "Q1".."Q4" stay as-is for output compatibility.
+# The year literals are prepended per calendar year by _timing_keywords().
+_TIMING_PHRASES = (
+    "this year", "next year",
+    "spring", "summer", "fall", "winter",
+    "Q1", "Q2", "Q3", "Q4"
+)
+_TERMINAL_STATUSES = frozenset({"Ended", "Canceled"})
+
+
+def _build_keyword_automaton():
+    """Aho–Corasick automaton over all signal keywords, built once at import.
+    None when pyahocorasick isn't installed (parser falls back to substring checks)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in _POSITIVE_KEYWORDS + _NEGATIVE_KEYWORDS:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Fallback without pyahocorasick: one compiled alternation scanned in C. The
+# zero-width lookahead reports a match at every position, so overlapping hits
+# ("pre-production" and "production") are all found, like substring checks.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in sorted(
+        _POSITIVE_KEYWORDS + _NEGATIVE_KEYWORDS, key=len, reverse=True)) + "))",
+    re.IGNORECASE)
+
+# get_enhanced_status coalescing: concurrent callers for the same show share one
+# computation (_inflight), and finished results are reused for the rest of the day
+# (_enhanced_cache, emptied when the date rolls over).
+_enhanced_lock = threading.Lock()
+_inflight: Dict[tuple, Future] = {}
+_enhanced_cache: Dict[tuple, Dict] = {}
+_enhanced_cache_day = 0
+
+
+def _enhanced_key(show_title: str, tmdb_id: int, tmdb_data: Dict, use_web_search: bool) -> tuple:
+    """Cache key: the show, today's date, and every TMDB field the classifier reads —
+    so a fresher TMDB payload never gets a stale answer."""
+    nxt = tmdb_data.get("next_episode_to_air") or {}
+    return (
+        tmdb_id, show_title, bool(use_web_search),
+        tmdb_data.get("status"), tmdb_data.get("in_production"), tmdb_data.get("last_air_date"),
+        nxt.get("air_date"), nxt.get("season_number"), nxt.get("episode_number"),
+        date.today().toordinal(),
+    )
+
 
 def get_enhanced_status(
     show_title: str,
@@ -24,6 +99,9 @@ def get_enhanced_status(
     """
     Get enhanced production status for a show
 
+    Duplicate concurrent calls for the same show wait on the first caller's result,
+    and repeat calls on the same day are served from an in-process cache.
+
     Args:
         show_title: Show title
         tmdb_id: TMDB show ID
@@ -33,6 +111,47 @@ def get_enhanced_status(
     Returns:
         Dictionary with enhanced status information
     """
+    global _enhanced_cache_day
+    key = _enhanced_key(show_title, tmdb_id, tmdb_data, use_web_search)
+
+    with _enhanced_lock:
+        cached = _enhanced_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    if not owner:
+        return dict(future.result())
+
+    try:
+        result = _compute_enhanced_status(show_title, tmdb_id, tmdb_data, use_web_search)
+    except BaseException as e:
+        with _enhanced_lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+
+    with _enhanced_lock:
+        if _enhanced_cache_day != key[-1]:
+            _enhanced_cache.clear()
+            _enhanced_cache_day = key[-1]
+        _enhanced_cache[key] = result
+        _inflight.pop(key, None)
+    future.set_result(result)
+    return dict(result)
+
+
+def _compute_enhanced_status(
+    show_title: str,
+    tmdb_id: int,
+    tmdb_data: Dict,
+    use_web_search: bool
+) -> Dict:
+    """Uncached body of get_enhanced_status"""
     status = tmdb_data.get("status", "Unknown")
     in_production = tmdb_data.get("in_production", False)
     next_episode = tmdb_data.get("next_episode_to_air")
@@ -57,7 +176,7 @@ def get_enhanced_status(
         "in_production": in_production,
         "has_next_episode": next_episode is not None,
         "last_air_date": last_air_date,
-        "needs_research": confidence == "low" and status not in ["Ended", "Canceled"]
+        "needs_research": confidence == "low" and status not in _TERMINAL_STATUSES
     }
 
     # If confidence is low and show might still be active, optionally search web
@@ -70,127 +189,161 @@ def get_enhanced_status(
     return result
 
 
-def _categorize_status(
-    status: str,
-    in_production: bool,
-    next_episode: Optional[Dict],
-    last_air_date: Optional[str],
-    last_episode: Optional[Dict],
-    show_title: str
-) -> Tuple[str, str, str]:
+# Enhanced-status decision tree, compiled to a table. _classify holds the rules;
+# it runs once per possible key at import to fill _DISPATCH, so classifying a show
+# is one dict lookup plus a message format.
+class TmdbStatus(IntEnum):
+    """TMDB `status` strings as integers, converted once per _categorize_status call"""
+    UNKNOWN = 0
+    ENDED = 1
+    CANCELED = 2
+    RETURNING = 3
+    PLANNED = 4
+    PILOT = 5
+    IN_PROD = 6
+
+
+_STATUS_MAP = {
+    "Ended": TmdbStatus.ENDED,
+    "Canceled": TmdbStatus.CANCELED,
+    "Returning Series": TmdbStatus.RETURNING,
+    "Planned": TmdbStatus.PLANNED,
+    "Pilot": TmdbStatus.PILOT,
+    "In Production": TmdbStatus.IN_PROD,
+}
+_YEAR_BUCKETS = (None, 0, 1, 3, 5, 10)  # None = no last_air_date; see _years_bucket
+
+
+def _years_bucket(years_since: Optional[float]) -> Optional[int]:
+    """Bucket years-since-last-air on the thresholds the rules care about"""
+    if years_since is None:
+        return None
+    if years_since < 1:
+        return 0
+    if years_since < 3:
+        return 1
+    if years_since <= 5:
+        return 3
+    if years_since <= 10:
+        return 5
+    return 10
+
+
+def _classify(status: TmdbStatus, in_production: bool, has_next: bool, bucket: Optional[int]) -> Tuple[str, str, str]:
     """
-    Categorize show status into clear categories
+    The classification rules, as (category, confidence, message template).
 
-    Returns:
-        Tuple of (category_emoji, confidence_level, message)
+    Templates may use {date} (formatted last air date), {years}, and for scheduled
+    episodes {season}, {episode} and {next_date}.
     """
     # ENDED - Clear case
-    if status == "Ended":
-        if last_air_date:
-            return ("ENDED", "high", f"Series concluded. Final episode aired {_format_date(last_air_date)}.")
+    if status == TmdbStatus.ENDED:
+        if bucket is not None:
+            return ("ENDED", "high", "Series concluded. Final episode aired {date}.")
         return ("ENDED", "high", "Series has concluded.")
 
     # CANCELED - Clear case
-    if status == "Canceled":
-        if last_air_date:
-            return ("CANCELED", "high", f"Canceled. Last episode aired {_format_date(last_air_date)}.")
+    if status == TmdbStatus.CANCELED:
+        if bucket is not None:
+            return ("CANCELED", "high", "Canceled. Last episode aired {date}.")
         return ("CANCELED", "high", "Show has been canceled.")
 
     # HAS SCHEDULED EPISODE - Clear case
-    if next_episode:
-        air_date = next_episode.get("air_date")
-        season = next_episode.get("season_number")
-        episode = next_episode.get("episode_number")
-
-        if air_date:
-            formatted_date = _format_date(air_date)
-            return (
-                "SCHEDULED",
-                "high",
-                f"Next episode: S{season}E{episode} on {formatted_date}"
-            )
+    if has_next:
+        return ("SCHEDULED", "high", "Next episode: S{season}E{episode} on {next_date}")
 
     # IN PRODUCTION - High confidence
-    if in_production and status == "Returning Series":
-        return (
-            "IN PRODUCTION",
-            "high",
-            "Currently in production. New season confirmed but air date not announced."
-        )
+    if in_production and status == TmdbStatus.RETURNING:
+        return ("IN PRODUCTION", "high",
+                "Currently in production. New season confirmed but air date not announced.")
 
     # RETURNING SERIES - but not in production
-    if status == "Returning Series":
-        if last_air_date:
-            years_since = _years_since(last_air_date)
-
-            if years_since < 1:
-                return (
-                    "RETURNING SOON",
-                    "medium",
-                    f"Show is active. Last aired {_format_date(last_air_date)}. New season expected."
-                )
-            elif years_since < 3:
-                return (
-                    "UNCERTAIN",
-                    "low",
-                    f"Marked as returning series, but last aired {_format_date(last_air_date)} ({years_since:.0f} years ago). Status unclear."
-                )
-            else:
-                return (
-                    "ON HIATUS",
-                    "low",
-                    f"On extended hiatus. Last aired {_format_date(last_air_date)} ({years_since:.0f} years ago)."
-                )
-
-        return ("RETURNING SOON", "medium", "Marked as returning series. No air date announced.")
+    if status == TmdbStatus.RETURNING:
+        if bucket is None:
+            return ("RETURNING SOON", "medium", "Marked as returning series. No air date announced.")
+        if bucket == 0:
+            return ("RETURNING SOON", "medium",
+                    "Show is active. Last aired {date}. New season expected.")
+        if bucket == 1:
+            return ("UNCERTAIN", "low",
+                    "Marked as returning series, but last aired {date} ({years:.0f} years ago). Status unclear.")
+        return ("ON HIATUS", "low", "On extended hiatus. Last aired {date} ({years:.0f} years ago).")
 
     # IN PRODUCTION - but status is unclear
     if in_production:
-        return (
-            "IN PRODUCTION",
-            "medium",
-            "Currently in production. Status and air date to be confirmed."
-        )
+        return ("IN PRODUCTION", "medium",
+                "Currently in production. Status and air date to be confirmed.")
 
     # PLANNED
-    if status == "Planned":
-        return (
-            "RENEWED",
-            "medium",
-            "Show has been renewed. Production has not yet started."
-        )
+    if status == TmdbStatus.PLANNED:
+        return ("RENEWED", "medium", "Show has been renewed. Production has not yet started.")
 
     # PILOT
-    if status == "Pilot":
-        return (
-            "PILOT",
-            "high",
-            "Pilot episode available. Series pickup not yet confirmed."
-        )
+    if status == TmdbStatus.PILOT:
+        return ("PILOT", "high", "Pilot episode available. Series pickup not yet confirmed.")
 
     # OLD SHOW - Legacy content
-    if last_air_date:
-        years_since = _years_since(last_air_date)
-
-        if years_since > 10:
-            return (
-                "LEGACY",
-                "high",
-                f"Classic show. Last aired {_format_date(last_air_date)} ({years_since:.0f} years ago). No new episodes expected."
-            )
-        elif years_since > 5:
-            return (
-                "ON HIATUS",
-                "medium",
-                f"On extended hiatus. Last aired {_format_date(last_air_date)} ({years_since:.0f} years ago)."
-            )
+    if bucket == 10:
+        return ("LEGACY", "high",
+                "Classic show. Last aired {date} ({years:.0f} years ago). No new episodes expected.")
+    if bucket == 5:
+        return ("ON HIATUS", "medium", "On extended hiatus. Last aired {date} ({years:.0f} years ago).")
 
     # UNKNOWN - Fallback
-    return (
-        "UNCERTAIN",
-        "low",
-        "Status uncertain. Check TMDB or search online for production news."
-    )
+    return ("UNCERTAIN", "low", "Status uncertain. Check TMDB or search online for production news.")
+
+
+_DISPATCH: Dict[tuple, Tuple[str, str, str]] = {
+    (status, in_production, has_next, bucket): _classify(status, in_production, has_next, bucket)
+    for status in TmdbStatus
+    for in_production in (False, True)
+    for has_next in (False, True)
+    for bucket in _YEAR_BUCKETS
+}
+
+
+def _categorize_status(
+    status: str,
+    in_production: bool,
+    next_episode: Optional[Dict],
+    last_air_date: Optional[str],
+    last_episode: Optional[Dict],
+    show_title: str
+) -> Tuple[str, str, str]:
+    """
+    Categorize show status into clear categories
+
+    Returns:
+        Tuple of (category_emoji, confidence_level, message)
+    """
+    # Fast path: the Ended/Canceled rules only ask whether a last air date exists,
+    # so skip the years-since math (and formatting when there's nothing to format)
+    code = _STATUS_MAP.get(status, TmdbStatus.UNKNOWN)
+    if code == TmdbStatus.ENDED or code == TmdbStatus.CANCELED:
+        category, confidence, template = _DISPATCH[(code, False, False, 0 if last_air_date else None)]
+        if last_air_date:
+            template = template.format(date=_format_date(last_air_date))
+        return (category, confidence, template)
+
+    # Dates are parsed/formatted once here, and only when the template uses them
+    years_since = _years_since(last_air_date, date.today()) if last_air_date else None
+    has_next = bool(next_episode and next_episode.get("air_date"))
+
+    category, confidence, template = _DISPATCH[(
+        code,
+        bool(in_production),
+        has_next,
+        _years_bucket(years_since),
+    )]
+
+    fields = {"years": years_since}
+    if last_air_date and "{date}" in template:
+        fields["date"] = _format_date(last_air_date)
+    if has_next:
+        fields["season"] = next_episode.get("season_number")
+        fields["episode"] = next_episode.get("episode_number")
+        fields["next_date"] = _format_date(next_episode["air_date"])
+    return (category, confidence, template.format(**fields))
 
 
 def _search_production_news(show_title: str, tmdb_data: Dict) -> Optional[str]:
@@ -210,24 +363,56 @@ def _search_production_news(show_title: str, tmdb_data: Dict) -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=4096)
+def _parse_iso_date(date_str: str) -> Optional[date]:
+    """Parse TMDB's fixed YYYY-MM-DD layout by position (no strptime). None if malformed."""
+    try:
+        if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+            return None
+        return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+    except (TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4096)
 def _format_date(date_str: str) -> str:
     """Format date string to human-readable format"""
-    try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        return date_obj.strftime("%B %d, %Y")
-    except Exception:
-        return date_str
+    date_obj = _parse_iso_date(date_str)
+    return date_obj.strftime("%B %d, %Y") if date_obj else date_str
 
 
-def _years_since(date_str: str) -> float:
-    """Calculate years since a date"""
-    try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-        today = date.today()
-        delta = today - date_obj
-        return delta.days / 365.25
-    except Exception:
+def _years_since(date_str: str, today: Optional[date] = None) -> float:
+    """Calculate years since a date (pass `today` to reuse one clock read per batch)"""
+    date_obj = _parse_iso_date(date_str)
+    if date_obj is None:
         return 0.0
+    return ((today or date.today()) - date_obj).days / 365.25
+
+
+_year_cache = [0, 0.0]  # [year, monotonic time it was read]
+
+
+def _current_year() -> int:
+    """Current year, re-read from the clock at most once an hour"""
+    now = time.monotonic()
+    if not _year_cache[0] or now - _year_cache[1] > 3600:
+        _year_cache[0], _year_cache[1] = datetime.now().year, now
+    return _year_cache[0]
+
+
+@lru_cache(maxsize=2)
+def _timing_keywords_for(year: int) -> tuple:
+    return (str(year), str(year + 1), str(year + 2)) + _TIMING_PHRASES
+
+
+def _timing_keywords() -> tuple:
+    """Timing phrases for the current year (this year and the next two)"""
+    return _timing_keywords_for(_current_year())
+
+
+@lru_cache(maxsize=8192)
+def _search_query(show_title: str, current_season: int, year: int) -> str:
+    return f'"{show_title}" season {current_season + 1} production filming release date {year} {year + 1}'
 
 
 def get_production_search_query(show_title: str, current_season: int) -> str:
@@ -241,10 +426,7 @@ def get_production_search_query(show_title: str, current_season: int) -> str:
     Returns:
         Search query string
     """
-    next_season = current_season + 1
-    current_year = datetime.now().year
-
-    return f'"{show_title}" season {next_season} production filming release date {current_year} {current_year + 1}'
+    return _search_query(show_title, current_season, _current_year())
 
 
 def parse_web_search_results(search_results: str, show_title: str) -> Dict:
@@ -258,32 +440,18 @@ def parse_web_search_results(search_results: str, show_title: str) -> Dict:
     Returns:
         Dictionary with extracted intel
     """
-    # Keywords to look for
-    positive_keywords = [
-        "renewed", "filming", "production", "scheduled", "confirmed",
-        "greenlit", "announced", "in development", "pre-production",
-        "shooting", "principal photography", "wrapping", "post-production"
-    ]
-
-    negative_keywords = [
-        "canceled", "cancelled", "axed", "not renewed", "no season",
-        "final season", "series finale", "concluded", "ended"
-    ]
-
-    timing_keywords = {
-        "2024": 2024, "2025": 2025, "2026": 2026,
-        "this year": datetime.now().year,
-        "next year": datetime.now().year + 1,
-        "spring": "Spring", "summer": "Summer", "fall": "Fall", "winter": "Winter",
-        "Q1": "Q1", "Q2": "Q2", "Q3": "Q3", "Q4": "Q4"
-    }
-
     search_lower = search_results.lower()
 
-    # Check for positive signals
-    found_positive = [kw for kw in positive_keywords if kw in search_lower]
-    found_negative = [kw for kw in negative_keywords if kw in search_lower]
-    found_timing = [kw for kw in timing_keywords if kw in search_lower]
+    # Check for positive/negative signals — a single pass over the text
+    if _KEYWORD_AUTOMATON is not None:
+        hits = {kw for _, kw in _KEYWORD_AUTOMATON.iter(search_lower)}
+    else:
+        hits = {m.group(1).lower() for m in _KEYWORD_RE.finditer(search_results)}
+    # Set intersection finds the hits; the tuples only restore reporting order
+    pos_hits, neg_hits = hits & _POSITIVE_SET, hits & _NEGATIVE_SET
+    found_positive = [kw for kw in _POSITIVE_KEYWORDS if kw in pos_hits] if pos_hits else []
+    found_negative = [kw for kw in _NEGATIVE_KEYWORDS if kw in neg_hits] if neg_hits else []
+    found_timing = [kw for kw in _timing_keywords() if kw in search_lower]
 
     intel = {
         "has_positive_signals": len(found_positive) > 0,
@@ -311,27 +479,43 @@ def parse_web_search_results(search_results: str, show_title: str) -> Dict:
     return intel
 
 
+# Badge lookups keyed on the categories _categorize_status emits
+# (emojis per PRODUCTION_INTEL_README.md)
+_CATEGORY_EMOJIS = {
+    "SCHEDULED": "📅", "IN PRODUCTION": "🎬", "RETURNING SOON": "📺", "RENEWED": "✅",
+    "UNCERTAIN": "❓", "ON HIATUS": "⏸️", "ENDED": "🎭", "CANCELED": "❌",
+    "LEGACY": "💀", "PILOT": "🚀",
+}
+_CATEGORY_COLORS = {
+    "IN PRODUCTION": "green", "SCHEDULED": "green",
+    "RENEWED": "blue", "RETURNING SOON": "blue",
+    "UNCERTAIN": "orange", "ON HIATUS": "orange",
+    "ENDED": "red", "CANCELED": "red", "LEGACY": "red",
+    "PILOT": "gray",
+}
+
+
+@lru_cache(maxsize=64)
 def get_status_emoji(category: str) -> str:
     """Get just the emoji from a category string"""
     if not category:
         return "❓"
 
-    # Extract emoji (first part before space)
+    emoji = _CATEGORY_EMOJIS.get(category)
+    if emoji:
+        return emoji
+
+    # Legacy stored values carry the emoji inline ("🎬 IN PRODUCTION")
     parts = category.split()
     return parts[0] if parts else "❓"
 
 
+@lru_cache(maxsize=64)
 def get_status_color(category: str) -> str:
     """Get color for status badge"""
-    category_lower = category.lower()
-
-    if "production" in category_lower or "scheduled" in category_lower:
-        return "green"
-    elif "renewed" in category_lower or "returning" in category_lower:
-        return "blue"
-    elif "uncertain" in category_lower or "hiatus" in category_lower:
-        return "orange"
-    elif "ended" in category_lower or "canceled" in category_lower or "legacy" in category_lower:
-        return "red"
-    else:
-        return "gray"
+    color = _CATEGORY_COLORS.get(category)
+    if color:
+        return color
+    # Legacy "🎬 IN PRODUCTION" / mixed-case values: retry on the bare upper-case name
+    bare = (category or "").upper()
+    return _CATEGORY_COLORS.get(bare) or _CATEGORY_COLORS.get(bare.split(" ", 1)[-1], "gray")
@@ -3,29 +3,128 @@ Scheduled background tasks for StreamGenie
 Handles scheduled email reminders and background jobs
 """
 import os
+import time
+import threading
+from collections import defaultdict
 import datetime as dt
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+from zoneinfo import ZoneInfo
 from supabase import Client
 import notifications
-from typing import Optional
+import preferences
+import show_status
+from typing import Callable, Dict, Optional
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
+# The default format never prints thread/process fields: skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logger = logging.getLogger(__name__)
 
+_DAYS_OF_WEEK = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+class _CronJob:
+    """
+    A daily (or weekly, with day_of_week) job at a fixed local wall-clock time.
+
+    The next fire time is kept as an integer epoch: the timezone is consulted once
+    when scheduling and after each fire only to confirm the wall-clock time — a
+    fire just adds one period, recomputing via zoneinfo only across a DST change.
+    name / next_run_time are what the admin panel lists.
+    """
+
+    def __init__(self, job_id: str, name: str, func: Callable, hour: int, minute: int,
+                 timezone: str, day_of_week: Optional[str] = None):
+        self.id = job_id
+        self.name = name
+        self.func = func
+        self.hour = hour
+        self.minute = minute
+        self.tz = ZoneInfo(timezone)
+        self.weekday = _DAYS_OF_WEEK.index(day_of_week.lower()) if day_of_week else None
+        self.period = 86400 if self.weekday is None else 7 * 86400
+        self.next_epoch = int(self.next_after(dt.datetime.now(self.tz)).timestamp())
+
+    @property
+    def next_run_time(self) -> dt.datetime:
+        return dt.datetime.fromtimestamp(self.next_epoch, self.tz)
+
+    def next_after(self, now: dt.datetime) -> dt.datetime:
+        """First fire time strictly after `now` (aware datetimes, wall-clock arithmetic)"""
+        now = now.astimezone(self.tz)
+        run = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        if self.weekday is not None:
+            run += dt.timedelta(days=(self.weekday - run.weekday()) % 7)
+        if run <= now:
+            run += dt.timedelta(days=1 if self.weekday is None else 7)
+        return run
+
+    def advance(self, now_epoch: float):
+        """Move next_epoch past now_epoch by whole periods; if that lands off the
+        configured local time (a DST switch happened), recompute from the timezone."""
+        nxt = self.next_epoch + self.period
+        while nxt <= now_epoch:
+            nxt += self.period
+        local = dt.datetime.fromtimestamp(nxt, self.tz)
+        if (local.hour, local.minute) != (self.hour, self.minute):
+            nxt = int(self.next_after(dt.datetime.fromtimestamp(now_epoch, self.tz)).timestamp())
+        self.next_epoch = nxt
+
 
 class TaskScheduler:
     """
     Manages scheduled background tasks
+
+    One daemon thread sleeps until the next due job, runs it, and goes back to
+    sleep. It is started on the first registration, so an instance with no jobs
+    (the default — cron_runner.py owns the schedule) costs no thread at all.
     """
 
     def __init__(self, client: Client):
         self.client = client
-        self.scheduler = BackgroundScheduler()
-        self.scheduler.start()
-        logger.info("Task scheduler started")
+        self._jobs: Dict[str, _CronJob] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _add_job(self, job: _CronJob):
+        """Register (or replace) a job and wake the loop so it re-plans its sleep.
+        (Re)starts the loop thread if it isn't running, e.g. after stop()."""
+        with self._lock:
+            self._jobs[job.id] = job
+            if self._thread is None or not self._thread.is_alive() or self._stop_event.is_set():
+                # Fresh stop flag per thread, so a stopped loop still winding down
+                # can't be revived alongside the new one
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(self._stop_event,),
+                                                name="task-scheduler", daemon=True)
+                self._thread.start()
+                logger.info("Task scheduler started")
+        self._wake.set()
+
+    def _run_loop(self, stop_event: threading.Event):
+        """Sleep until the earliest next_epoch, fire whatever is due, repeat"""
+        while not stop_event.is_set():
+            now = time.time()
+            with self._lock:
+                due = [job for job in self._jobs.values() if job.next_epoch <= now]
+                for job in due:
+                    job.advance(now)
+            for job in due:
+                try:
+                    job.func()
+                except Exception as e:
+                    logger.error(f"Scheduled job {job.id} failed: {e}")
+
+            with self._lock:
+                next_epoch = min((job.next_epoch for job in self._jobs.values()), default=None)
+            timeout = None if next_epoch is None else max(0.0, next_epoch - time.time())
+            self._wake.wait(timeout)
+            self._wake.clear()
 
     def schedule_daily_reminders(self, hour: int = 8, minute: int = 0, timezone: str = "America/New_York"):
         """
@@ -36,19 +135,14 @@ class TaskScheduler:
             minute: Minute of hour (0-59)
             timezone: Timezone string (e.g., 'America/New_York', 'UTC')
         """
-        trigger = CronTrigger(
+        self._add_job(_CronJob(
+            job_id='daily_reminders',
+            name='Send daily email reminders',
+            func=self._send_daily_reminders_to_all_users,
             hour=hour,
             minute=minute,
             timezone=timezone
-        )
-
-        self.scheduler.add_job(
-            func=self._send_daily_reminders_to_all_users,
-            trigger=trigger,
-            id='daily_reminders',
-            replace_existing=True,
-            name='Send daily email reminders'
-        )
+        ))
 
         logger.info(f"Scheduled daily reminders for {hour:02d}:{minute:02d} {timezone}")
 
@@ -62,20 +156,15 @@ class TaskScheduler:
             minute: Minute of hour (0-59)
             timezone: Timezone string
         """
-        trigger = CronTrigger(
-            day_of_week=day_of_week,
+        self._add_job(_CronJob(
+            job_id='weekly_preview',
+            name='Send weekly preview emails',
+            func=self._send_weekly_preview_to_all_users,
             hour=hour,
             minute=minute,
-            timezone=timezone
-        )
-
-        self.scheduler.add_job(
-            func=self._send_weekly_preview_to_all_users,
-            trigger=trigger,
-            id='weekly_preview',
-            replace_existing=True,
-            name='Send weekly preview emails'
-        )
+            timezone=timezone,
+            day_of_week=day_of_week
+        ))
 
         logger.info(f"Scheduled weekly preview for {day_of_week} {hour:02d}:{minute:02d} {timezone}")
 
@@ -103,41 +192,35 @@ class TaskScheduler:
                 return
 
             # Group shows by user
-            users_shows = {}
+            users_shows = defaultdict(list)
             for show in result.data:
-                user_id = show["user_id"]
-                if user_id not in users_shows:
-                    users_shows[user_id] = []
-                users_shows[user_id].append(show)
+                users_shows[show["user_id"]].append(show)
 
             logger.info(f"Found {len(users_shows)} users with shows airing today")
 
-            # Send ONE consolidated reminder per user (not one per show).
+            # One users query per 200 ids instead of one per user (N+1 → N/200)
+            user_ids = list(users_shows.keys())
+            email_by_id = {}
+            for i in range(0, len(user_ids), 200):
+                user_result = self.client.table("users")\
+                    .select("id, email")\
+                    .in_("id", user_ids[i:i+200])\
+                    .execute()
+                email_by_id.update((r["id"], r.get("email")) for r in user_result.data or [])
+
+            # ONE consolidated reminder per user (not one per show), and every user's
+            # digest goes out in a single bulk insert instead of a request per user.
             # Days with nothing airing were already skipped above — no empty digests.
-            emails_sent = 0
-            for user_id, shows in users_shows.items():
-                try:
-                    # Get user email
-                    user_result = self.client.table("users").select("email").eq("id", user_id).execute()
-                    if not user_result.data:
-                        continue
-
-                    user_email = user_result.data[0]["email"]
-
-                    notifications.notify_airing_digest(
-                        client=self.client,
-                        user_id=user_id,
-                        shows=shows
-                    )
-                    emails_sent += 1
-
-                    logger.info(f"Sent digest ({len(shows)} shows) to {user_email}")
-
-                except Exception as e:
-                    logger.error(f"Error sending reminders to user {user_id}: {e}")
-                    continue
+            prefs_by_user = preferences.get_preferences_bulk(self.client, list(users_shows))
+            digest_rows = [
+                {"user_id": user_id, **notifications.airing_digest_fields(shows)}
+                for user_id, shows in users_shows.items()
+                if user_id in email_by_id
+                and preferences.inapp_allowed(prefs_by_user.get(user_id), "new_episode")
+            ]
+            digests_posted = notifications.create_notifications_bulk(self.client, digest_rows)
 
-            logger.info(f"Daily reminder job complete: {emails_sent} digest(s) sent")
+            logger.info(f"Daily reminder job complete: {digests_posted} digest(s) posted")
 
             # Catch-up nudges (bell only, spoiler-free, ≤3 shows/user, weekly per show)
             try:
@@ -150,11 +233,8 @@ class TaskScheduler:
 
     def _aired_profile(self, tmdb_id: int):
         """(aired_episode_count, last_ep_is_finale, series_over) from TMDB."""
-        import os as _os
-        import requests as _rq
-        key = _os.getenv("TMDB_API_KEY", "").strip()
-        d = _rq.get(f"https://api.themoviedb.org/3/tv/{tmdb_id}",
-                    params={"api_key": key, "language": "en-US"}, timeout=15).json()
+        # Shared with the status checks: cached, rate-limited, seasons included
+        d = show_status.fetch_show_status(tmdb_id) or {}
         last = d.get("last_episode_to_air") or {}
         ls, le = last.get("season_number"), last.get("episode_number")
         if not ls:
@@ -254,12 +334,14 @@ class TaskScheduler:
 
     def stop(self):
         """Stop the scheduler"""
-        self.scheduler.shutdown()
+        self._stop_event.set()
+        self._wake.set()
         logger.info("Task scheduler stopped")
 
     def get_jobs(self):
         """Get list of scheduled jobs"""
-        return self.scheduler.get_jobs()
+        with self._lock:
+            return list(self._jobs.values())
 
 
 # Global scheduler instance
@@ -282,7 +364,7 @@ def init_scheduler(client: Client) -> TaskScheduler:
 
         # NOTE: the recurring reminder/newsletter jobs are intentionally NOT scheduled
         # here. They run from GitHub Actions cron (cron_runner.py) instead — a single
-        # fresh runner per fire. The in-app APScheduler lived inside long-running
+        # fresh runner per fire. The in-app scheduler lived inside long-running
         # Streamlit Cloud containers: several would be awake at once AND could be running
         # stale code (pre-deploy), so each fired the 8 AM job independently and produced
         # duplicate notifications that slipped past the dedup index. GitHub Actions is
@@ -5,60 +5,293 @@ and sends notifications when status changes
 Now with enhanced production intelligence!
 """
 import os
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
+from postgrest.exceptions import APIError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import datetime as dt
 from supabase import Client
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 import logging
 import notifications
+import paging
+import preferences
 import production_intel
 
+try:
+    import orjson  # optional (pip install orjson): faster decode of TMDB payloads
+except ImportError:
+    orjson = None
+
+try:
+    import redis  # optional (pip install redis): TMDB status cache shared across processes
+except ImportError:
+    redis = None
+
 logger = logging.getLogger(__name__)
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY", "").strip()
 TMDB_BASE = "https://api.themoviedb.org/3"
 
+# Concurrent TMDB fetches in check_all_shows_status (each blocks on network I/O)
+_FETCH_WORKERS = 16
+
+# Keep-alive TMDB session: check_all_shows_status hits /tv/{id} for every show on a
+# watchlist, so reusing the TLS connection saves a handshake on every call after the first.
+# The pool is sized so every fetch worker (plus background refreshes) keeps its own
+# warm connection — a smaller pool would discard and re-handshake under fan-out.
+# The adapter only retries failed connects; retries that reach TMDB (429/5xx) happen in
+# _fetch_show_status_live so each one waits for a rate-limiter slot like any request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10, pool_maxsize=_FETCH_WORKERS + 4,
+    max_retries=Retry(total=3, read=0, status=0, backoff_factor=0.5)))
+_SESSION.params = {"api_key": TMDB_API_KEY}
+_SESSION.headers["Accept"] = "application/json"
+
+# Process-wide limiter in front of every TMDB call: at most _TMDB_RATE requests per
+# _TMDB_WINDOW seconds (under TMDB's historical 40 / 10 s), so the fetch fan-out waits
+# for a slot instead of drawing 429s and retry round-trips.
+_TMDB_RATE = 35
+_TMDB_WINDOW = 10.0
+_TMDB_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_TMDB_ATTEMPTS = 4  # first try + 3 retries
+_tmdb_calls = deque()
+_tmdb_calls_lock = threading.Lock()
+
+
+def _wait_for_tmdb_slot():
+    """Block until a request fits in the sliding window, then claim it"""
+    while True:
+        with _tmdb_calls_lock:
+            now = time.monotonic()
+            while _tmdb_calls and now - _tmdb_calls[0] >= _TMDB_WINDOW:
+                _tmdb_calls.popleft()
+            if len(_tmdb_calls) < _TMDB_RATE:
+                _tmdb_calls.append(now)
+                return
+            wait = _TMDB_WINDOW - (now - _tmdb_calls[0])
+        time.sleep(wait)
+
+# In-process TTL cache for fetch_show_status: tmdb_id -> (expires_at, status dict or None, ETag).
+# Ended/Canceled shows practically never change; failed lookups are kept briefly so a
+# TMDB outage isn't hammered once per show.
+_STATUS_CACHE: Dict[int, Tuple[float, Optional[Dict], Optional[str]]] = {}
+_STATUS_CACHE_LOCK = threading.Lock()
+_STATUS_CACHE_MAX = 10000
+_TTL_TERMINAL = 7 * 24 * 3600
+_TTL_ACTIVE = 24 * 3600
+_TTL_MISS = 60
+
+# Shared layer under the in-process cache when REDIS_URL is set: every app/cron process
+# reuses one copy per show. Blobs carry their own fresh-until time and are kept well past
+# it, so a TMDB outage can be answered with the last good copy (flagged "stale"), and
+# an expired copy is revalidated with If-None-Match (304 = reuse it, no body to decode).
+# Configure the Redis instance with maxmemory-policy allkeys-lfu.
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+_REDIS = None
+if redis and REDIS_URL:
+    try:
+        _REDIS = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    except ValueError as e:
+        # Malformed URL: run without the shared cache rather than fail the import
+        logger.warning("Ignoring REDIS_URL: %s", e)
+_REDIS_KEEP = 30 * 24 * 3600
+
+# Stale-while-revalidate for is_series_finale: answer from the shows row, refresh
+# rows older than this in the background (one refresh per show at a time)
+_REFRESH_AFTER = dt.timedelta(hours=24)
+
+# check_all_shows_status re-checks Ended/Canceled rows only this often
+_TERMINAL_RECHECK = dt.timedelta(days=30)
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Columns _apply_status compares against
+# Single-row lookups filter user_id then tmdb_id, matching shows_user_tmdb_unique_idx
+# (migrations/2026-06-29_shows_one_row_per_user_tmdb.sql), so each is one index seek.
+_EXISTING_COLUMNS = "show_status, production_status, last_status_check, in_production"
+
+# What a Supabase call can raise: PostgREST errors, plus transport failures
+_DB_ERRORS = (APIError, httpx.HTTPError)
+
+# shows.last_air_date comes from migrations/2026-10-15_shows_last_air_date.sql. Until
+# that runs, the first write/read that trips over the column flips this off and the
+# row is retried without it (is_series_finale then asks TMDB instead).
+_has_last_air_date = True
+# PostgREST: unknown column in a write body / Postgres undefined_column in a select
+_UNDEFINED_COLUMN_CODES = {"PGRST204", "42703"}
+
+
+def _last_air_date_missing(e: Exception) -> bool:
+    """True (and stop using the column) if a DB error is an undefined column — only
+    asked about writes/reads that include shows.last_air_date"""
+    global _has_last_air_date
+    if getattr(e, "code", None) not in _UNDEFINED_COLUMN_CODES:
+        return False
+    if _has_last_air_date:
+        logger.warning("shows.last_air_date missing, writing status without it: %s", e)
+        _has_last_air_date = False
+    return True
+
 
-def fetch_show_status(tmdb_id: int) -> Optional[Dict]:
+def fetch_show_status(tmdb_id: int, force_refresh: bool = False) -> Optional[Dict]:
     """
-    Fetch show details from TMDB including status
+    Fetch show details from TMDB including status (cached: 7 days for Ended/Canceled,
+    24 hours otherwise, 60 seconds for failed lookups)
+
+    If TMDB fails but an older copy is cached, that copy is returned with "stale": True.
 
     Args:
         tmdb_id: TMDB show ID
+        force_refresh: Skip the cache and ask TMDB
 
     Returns:
-        Dictionary with status, name, last_air_date, etc. or None if error
+        Dictionary with status, name, last_air_date, seasons, external_ids, etc.
+        or None if error
     """
+    with _STATUS_CACHE_LOCK:
+        hit = _STATUS_CACHE.get(tmdb_id)
+    if not force_refresh and hit and hit[0] > time.monotonic():
+        return dict(hit[1]) if hit[1] else None
+    stale, etag = (hit[1], hit[2]) if hit and hit[1] else (None, None)
+
+    shared = _redis_get(tmdb_id)
+    if shared:
+        remaining = shared[0] - time.time()
+        if remaining > 0 and not force_refresh:
+            _cache_put(tmdb_id, shared[1], remaining, shared[2])
+            return dict(shared[1])
+        if not stale:
+            stale, etag = shared[1], shared[2]
+
+    if stale:
+        stale = {k: v for k, v in stale.items() if k != "stale"}
+    status_info, new_etag = _fetch_show_status_live(tmdb_id, etag if stale else None, stale)
+
+    if status_info is None:
+        if stale:
+            logger.warning("TMDB unavailable for %s; serving last cached status", tmdb_id)
+            status_info = {**stale, "stale": True}
+        _cache_put(tmdb_id, status_info, _TTL_MISS, etag)
+    else:
+        ttl = _TTL_TERMINAL if status_info["status"] in ("Ended", "Canceled") else _TTL_ACTIVE
+        _cache_put(tmdb_id, status_info, ttl, new_etag)
+        _redis_set(tmdb_id, status_info, ttl, new_etag)
+
+    # Callers get their own copy, never the cached dict
+    return dict(status_info) if status_info else None
+
+
+def _cache_put(tmdb_id: int, status_info: Optional[Dict], ttl: float, etag: Optional[str] = None):
+    now = time.monotonic()
+    with _STATUS_CACHE_LOCK:
+        if len(_STATUS_CACHE) >= _STATUS_CACHE_MAX:
+            for key in [k for k, entry in _STATUS_CACHE.items() if entry[0] <= now]:
+                del _STATUS_CACHE[key]
+            if len(_STATUS_CACHE) >= _STATUS_CACHE_MAX:
+                del _STATUS_CACHE[next(iter(_STATUS_CACHE))]  # oldest insert
+        _STATUS_CACHE[tmdb_id] = (now + ttl, status_info, etag)
+
+
+def _loads(raw):
+    """Parse JSON bytes/str with orjson when installed, stdlib json otherwise"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+
+def _redis_get(tmdb_id: int) -> Optional[Tuple[float, Dict, Optional[str]]]:
+    """(fresh-until epoch, status dict, ETag) from the shared cache, or None"""
+    if _REDIS is None:
+        return None
     try:
-        url = f"{TMDB_BASE}/tv/{tmdb_id}"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "append_to_response": "content_ratings"
-        }
+        blob = _REDIS.get(f"tmdb:tv:{tmdb_id}")
+    except redis.RedisError as e:
+        logger.warning("Redis read failed for %s: %s", tmdb_id, e)
+        return None
+    if not blob:
+        return None
+    try:
+        entry = _loads(blob)
+        data = dict(entry["data"])
+        if "status" not in data:
+            raise KeyError("status")  # callers index it; a blob without one is foreign
+        return float(entry["fresh_until"]), data, entry.get("etag")
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        # Corrupt or foreign value under our key → treat as a cache miss
+        logger.warning("Ignoring unreadable Redis entry for %s: %s", tmdb_id, e)
+        return None
 
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
 
-        data = response.json()
-
-        return {
-            "tmdb_id": tmdb_id,
-            "name": data.get("name", "Unknown"),
-            "status": data.get("status", "Unknown"),  # "Returning Series", "Ended", "Canceled", "In Production"
-            "type": data.get("type", "Scripted"),  # "Scripted", "Documentary", "Reality", etc.
-            "last_air_date": data.get("last_air_date"),
-            "number_of_seasons": data.get("number_of_seasons", 0),
-            "number_of_episodes": data.get("number_of_episodes", 0),
-            "in_production": data.get("in_production", False),
-            "next_episode_to_air": data.get("next_episode_to_air"),
-            "last_episode_to_air": data.get("last_episode_to_air")
-        }
-    except Exception as e:
-        logger.error(f"Error fetching status for TMDB ID {tmdb_id}: {e}")
-        return None
+def _redis_set(tmdb_id: int, status_info: Dict, ttl: float, etag: Optional[str] = None):
+    if _REDIS is None:
+        return
+    try:
+        _REDIS.set(f"tmdb:tv:{tmdb_id}",
+                   _dumps({"fresh_until": time.time() + ttl, "data": status_info, "etag": etag}),
+                   ex=_REDIS_KEEP)
+    except redis.RedisError as e:
+        logger.warning("Redis write failed for %s: %s", tmdb_id, e)
+
 
+def _fetch_show_status_live(tmdb_id: int, etag: Optional[str] = None,
+                            cached: Optional[Dict] = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """One TMDB /tv/{id} call, shaped for fetch_show_status. Returns (status, ETag).
 
-def update_show_status(client: Client, user_id: str, tmdb_id: int, show_title: str, use_web_search: bool = False) -> Optional[str]:
+    With `etag`, the request is conditional: a 304 returns `cached` without a body.
+    """
+    try:
+        for attempt in range(_TMDB_ATTEMPTS):
+            _wait_for_tmdb_slot()
+            response = _SESSION.get(
+                f"{TMDB_BASE}/tv/{tmdb_id}",
+                # One hit (and one rate-limit slot) covers every sub-resource callers use,
+                # so the cached entry serves them all
+                params={"append_to_response": "content_ratings,external_ids"},
+                headers={"If-None-Match": etag} if etag else None,
+                timeout=10
+            )
+            if response.status_code not in _TMDB_RETRY_STATUSES or attempt == _TMDB_ATTEMPTS - 1:
+                break
+            # Honor Retry-After (seconds), else back off 0.5 s, 1 s, 2 s
+            retry_after = response.headers.get("Retry-After", "")
+            time.sleep(float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt)
+        if response.status_code == 304 and cached:
+            return cached, etag
+        response.raise_for_status()
+        data = _loads(response.content)
+    except (requests.RequestException, ValueError) as e:
+        logger.error("Error fetching status for TMDB ID %s: %s", tmdb_id, e)
+        return None, None
+
+    return {
+        "tmdb_id": tmdb_id,
+        "name": data.get("name", "Unknown"),
+        "status": data.get("status", "Unknown"),  # "Returning Series", "Ended", "Canceled", "In Production"
+        "type": data.get("type", "Scripted"),  # "Scripted", "Documentary", "Reality", etc.
+        "last_air_date": data.get("last_air_date"),
+        "number_of_seasons": data.get("number_of_seasons", 0),
+        "number_of_episodes": data.get("number_of_episodes", 0),
+        "in_production": data.get("in_production", False),
+        "next_episode_to_air": data.get("next_episode_to_air"),
+        "last_episode_to_air": data.get("last_episode_to_air"),
+        "seasons": data.get("seasons", []),
+        "external_ids": data.get("external_ids", {})
+    }, response.headers.get("ETag")
+
+
+def update_show_status(client: Client, user_id: str, tmdb_id: int, show_title: str, use_web_search: bool = False,
+                       now_iso: Optional[str] = None, existing: Optional[Dict] = None) -> Optional[str]:
     """
     Update show status in database with enhanced production intelligence
 
@@ -68,80 +301,156 @@ def update_show_status(client: Client, user_id: str, tmdb_id: int, show_title: s
         tmdb_id: TMDB show ID
         show_title: Show title
         use_web_search: Whether to use web search for low-confidence cases
+        now_iso: Check timestamp to record (one UTC time per batch); defaults to now
+        existing: The show's current row if the caller already has it (_EXISTING_COLUMNS);
+            skips the SELECT. Omit to have it read here.
 
     Returns:
         New status string or None if error
     """
-    try:
-        # Fetch current status from TMDB
-        status_info = fetch_show_status(tmdb_id)
-        if not status_info:
-            return None
-
-        new_status = status_info["status"]
-
-        # Get enhanced production intelligence
-        enhanced = production_intel.get_enhanced_status(
-            show_title=show_title,
-            tmdb_id=tmdb_id,
-            tmdb_data=status_info,
-            use_web_search=use_web_search
-        )
+    # Fetch current status from TMDB (logs and returns None on failure)
+    status_info = fetch_show_status(tmdb_id)
+    if not status_info:
+        return None
 
+    if existing is None:
         # Get current status from database
-        result = client.table("shows")\
-            .select("show_status, production_status, last_status_check, in_production")\
-            .eq("user_id", user_id)\
-            .eq("tmdb_id", tmdb_id)\
-            .execute()
+        try:
+            result = client.table("shows")\
+                .select(_EXISTING_COLUMNS)\
+                .eq("user_id", user_id)\
+                .eq("tmdb_id", tmdb_id)\
+                .limit(1)\
+                .maybe_single()\
+                .execute()
+        except _DB_ERRORS as e:
+            logger.error("Error reading show status: %s", e)
+            return None
 
-        if not result.data or len(result.data) == 0:
+        # maybe_single: one object, or no response at all when the row is missing
+        existing = result.data if result else None
+        if not existing:
             # Show not found in user's watchlist
             return None
 
-        old_status = result.data[0].get("show_status", "Unknown")
-        old_production_status = result.data[0].get("production_status", "Unknown")
-        old_in_production = result.data[0].get("in_production")
-        old_last_check = result.data[0].get("last_status_check")
-        status_changed = old_status != new_status or old_production_status != enhanced["category"]
-
-        # Update status in database with enhanced fields
-        update_data = {
-            "show_status": new_status,
-            "production_status": enhanced["category"],
-            "status_confidence": enhanced["confidence"],
-            "status_message": enhanced["message"],
-            "in_production": status_info.get("in_production", False),
-            "last_status_check": dt.datetime.now().isoformat(),
-            "last_intel_check": dt.datetime.now().isoformat()
-        }
-
-        # Add web intel if available
-        if "web_intel" in enhanced:
-            update_data["web_intel"] = str(enhanced["web_intel"])
+    return _apply_status(client, user_id, tmdb_id, show_title, status_info,
+                         existing, use_web_search, now_iso)
+
+
+def _status_update(tmdb_id: int, show_title: str, status_info: Dict,
+                   use_web_search: bool = False, now_iso: Optional[str] = None) -> Tuple[Dict, Dict]:
+    """Enhanced production intel plus the shows-row fields for a fresh TMDB status.
+    Returns (update_data, enhanced)."""
+    enhanced = production_intel.get_enhanced_status(
+        show_title=show_title,
+        tmdb_id=tmdb_id,
+        tmdb_data=status_info,
+        use_web_search=use_web_search
+    )
+
+    now_iso = now_iso or dt.datetime.now(dt.timezone.utc).isoformat()
+    update_data = {
+        "show_status": status_info["status"],
+        "production_status": enhanced["category"],
+        "status_confidence": enhanced["confidence"],
+        "status_message": enhanced["message"],
+        "in_production": status_info.get("in_production", False),
+        "last_status_check": now_iso,
+        "last_intel_check": now_iso
+    }
+    if _has_last_air_date:
+        # TMDB sends "" for unaired shows; the DATE column needs NULL
+        update_data["last_air_date"] = status_info.get("last_air_date") or None
 
-        client.table("shows")\
-            .update(update_data)\
-            .eq("user_id", user_id)\
-            .eq("tmdb_id", tmdb_id)\
-            .execute()
+    # Add web intel if available
+    if "web_intel" in enhanced:
+        update_data["web_intel"] = str(enhanced["web_intel"])
 
-        logger.info(f"Updated status for {show_title} (ID: {tmdb_id}): {old_status} -> {new_status} | Enhanced: {enhanced['category']}")
+    return update_data, enhanced
 
-        # Send notifications if status changed to Ended or Canceled
-        if status_changed and new_status in ["Ended", "Canceled"]:
-            notify_status_change(client, user_id, tmdb_id, show_title, old_status, new_status, status_info)
 
-        # Renewal / no-return-date production signals
-        notify_production_changes(
-            client, user_id, tmdb_id, show_title,
-            old_in_production, old_last_check, new_status, status_info)
+def _notify_status_changes(
+    client: Client,
+    user_id: str,
+    tmdb_id: int,
+    show_title: str,
+    status_info: Dict,
+    existing: Dict,
+    new_category: str,
+    pending: Optional[List[Dict]] = None,
+    nudged: Optional[set] = None
+):
+    """Finale/cancel and production notifications, comparing against the pre-update row.
+    `nudged` = preloaded (user_id, tmdb_id) pairs that already have a no_return notice."""
+    new_status = status_info["status"]
+    old_status = existing.get("show_status", "Unknown")
+    old_production_status = existing.get("production_status", "Unknown")
+    status_changed = old_status != new_status or old_production_status != new_category
+
+    # Send notifications if status changed to Ended or Canceled
+    if status_changed and new_status in ["Ended", "Canceled"]:
+        notify_status_change(client, user_id, tmdb_id, show_title, old_status, new_status, status_info,
+                             pending)
+
+    # Renewal / no-return-date production signals
+    notify_production_changes(
+        client, user_id, tmdb_id, show_title,
+        existing.get("in_production"), existing.get("last_status_check"), new_status, status_info,
+        pending, nudged)
+
+
+def _create_or_queue(client: Client, pending: Optional[List[Dict]], **notification):
+    """Bell-only notification: created now, or appended to `pending` for a bulk insert"""
+    if pending is None:
+        notifications.create_notification(client=client, send_email=False, **notification)
+    else:
+        pending.append(notification)
+
+
+def _apply_status(
+    client: Client,
+    user_id: str,
+    tmdb_id: int,
+    show_title: str,
+    status_info: Dict,
+    existing: Dict,
+    use_web_search: bool = False,
+    now_iso: Optional[str] = None
+) -> Optional[str]:
+    """
+    Write freshly fetched TMDB status for one show and send change notifications
 
-        return new_status
-    except Exception as e:
-        logger.error(f"Error updating show status: {e}")
+    Args:
+        client: Supabase client
+        user_id: User ID
+        tmdb_id: TMDB show ID
+        show_title: Show title
+        status_info: Result of fetch_show_status
+        existing: The show's current row (_EXISTING_COLUMNS)
+        use_web_search: Whether to use web search for low-confidence cases
+        now_iso: Check timestamp to record; defaults to now
+
+    Returns:
+        New status string or None if error
+    """
+    new_status = status_info["status"]
+    update_data, enhanced = _status_update(tmdb_id, show_title, status_info, use_web_search, now_iso)
+
+    try:
+        _update_show_row(client, user_id, tmdb_id, update_data)
+    except _DB_ERRORS as e:
+        logger.error("Error updating show status: %s", e)
         return None
 
+    old_status = existing.get("show_status", "Unknown")
+    logger.info("Updated status for %s (ID: %s): %s -> %s | Enhanced: %s",
+                show_title, tmdb_id, old_status, new_status, enhanced['category'])
+
+    _notify_status_changes(client, user_id, tmdb_id, show_title, status_info, existing,
+                           enhanced["category"])
+
+    return new_status
+
 
 def _has_existing_notification(client: Client, user_id: str, tmdb_id: int, ntype: str) -> bool:
     """True if a notification of this type already exists for this user+show (de-dup)."""
@@ -150,7 +459,7 @@ def _has_existing_notification(client: Client, user_id: str, tmdb_id: int, ntype
             .eq("user_id", user_id).eq("related_show_id", tmdb_id)\
             .eq("notification_type", ntype).limit(1).execute()
         return bool(r.data)
-    except Exception:
+    except _DB_ERRORS:
         return False
 
 
@@ -162,7 +471,9 @@ def notify_production_changes(
     old_in_production,
     old_last_check,
     new_status: str,
-    status_info: Dict
+    status_info: Dict,
+    pending: Optional[List[Dict]] = None,
+    nudged: Optional[set] = None
 ):
     """Two production-state notifications for shows already on the watchlist:
 
@@ -170,50 +481,50 @@ def notify_production_changes(
     2. ⏳ No return date — a 'Returning' show that's NOT in production, has no scheduled
        next episode, and last aired >12 months ago (likely limbo / possible one-and-done).
        Fired at most once per show.
-    """
-    try:
-        new_ip = bool(status_info.get("in_production"))
-        nxt = status_info.get("next_episode_to_air")
-        has_next = isinstance(nxt, dict) and bool(nxt.get("air_date"))
-
-        # 1) Renewed — only on a genuine False→True flip we've actually observed before
-        #    (old_last_check guards against a false positive on a show's first-ever check).
-        if (old_last_check and old_in_production is False and new_ip
-                and new_status in ("Returning Series", "In Production", "Planned")):
-            notifications.create_notification(
-                client=client, user_id=user_id, notification_type="renewed",
-                title=f"🛠️ Renewed: {show_title}",
-                message=(f"{show_title} is back in production — a new season is being made. "
-                         f"No air date has been announced yet, but it's officially returning."),
-                related_show_id=tmdb_id, related_show_title=show_title,
-                send_email=False)  # bell only; weekly newsletter is the email surface
-            logger.info(f"Sent renewal notification for {show_title}")
-            return
 
-        # 2) No return date — limbo nudge, once per show
-        if new_status == "Returning Series" and not new_ip and not has_next:
-            last = status_info.get("last_episode_to_air") or {}
-            last_ad = last.get("air_date")
-            gap_days = None
-            if last_ad:
-                try:
-                    gap_days = (dt.date.today() - dt.date.fromisoformat(last_ad)).days
-                except Exception:
-                    gap_days = None
-            if (gap_days is not None and gap_days > 365
-                    and not _has_existing_notification(client, user_id, tmdb_id, "no_return")):
-                months = gap_days // 30
-                notifications.create_notification(
-                    client=client, user_id=user_id, notification_type="no_return",
-                    title=f"⏳ No return date: {show_title}",
-                    message=(f"{show_title} is still listed as returning, but its last episode aired about "
-                             f"{months} months ago and nothing is in production. A new season hasn't been "
-                             f"confirmed — you may want to decide whether to keep tracking it."),
-                    related_show_id=tmdb_id, related_show_title=show_title,
-                    send_email=False)  # in-app only by default
-                logger.info(f"Sent no-return nudge for {show_title}")
-    except Exception as e:
-        logger.error(f"Error in notify_production_changes for {show_title}: {e}")
+    With `pending`, the rows are queued there for one bulk insert instead of written now.
+    With `nudged` (preloaded (user_id, tmdb_id) pairs that already got a no-return
+    notice), the once-per-show check is a set lookup instead of a query.
+    """
+    new_ip = bool(status_info.get("in_production"))
+    nxt = status_info.get("next_episode_to_air")
+    has_next = isinstance(nxt, dict) and bool(nxt.get("air_date"))
+
+    # 1) Renewed — only on a genuine False→True flip we've actually observed before
+    #    (old_last_check guards against a false positive on a show's first-ever check).
+    if (old_last_check and old_in_production is False and new_ip
+            and new_status in ("Returning Series", "In Production", "Planned")):
+        _create_or_queue(  # bell only; weekly newsletter is the email surface
+            client, pending, user_id=user_id, notification_type="renewed",
+            title=f"🛠️ Renewed: {show_title}",
+            message=(f"{show_title} is back in production — a new season is being made. "
+                     f"No air date has been announced yet, but it's officially returning."),
+            related_show_id=tmdb_id, related_show_title=show_title)
+        logger.info("Sent renewal notification for %s", show_title)
+        return
+
+    # 2) No return date — limbo nudge, once per show
+    if new_status == "Returning Series" and not new_ip and not has_next:
+        last = status_info.get("last_episode_to_air") or {}
+        last_ad = last.get("air_date")
+        gap_days = None
+        if last_ad:
+            try:
+                gap_days = (dt.date.today() - dt.date.fromisoformat(last_ad)).days
+            except ValueError:
+                gap_days = None
+        if (gap_days is not None and gap_days > 365
+                and not ((user_id, tmdb_id) in nudged if nudged is not None
+                         else _has_existing_notification(client, user_id, tmdb_id, "no_return"))):
+            months = gap_days // 30
+            _create_or_queue(  # in-app only by default
+                client, pending, user_id=user_id, notification_type="no_return",
+                title=f"⏳ No return date: {show_title}",
+                message=(f"{show_title} is still listed as returning, but its last episode aired about "
+                         f"{months} months ago and nothing is in production. A new season hasn't been "
+                         f"confirmed — you may want to decide whether to keep tracking it."),
+                related_show_id=tmdb_id, related_show_title=show_title)
+            logger.info("Sent no-return nudge for %s", show_title)
 
 
 def notify_status_change(
@@ -223,7 +534,8 @@ def notify_status_change(
     show_title: str,
     old_status: str,
     new_status: str,
-    status_info: Dict
+    status_info: Dict,
+    pending: Optional[List[Dict]] = None
 ):
     """
     Send notification when show status changes to Ended or Canceled
@@ -236,57 +548,54 @@ def notify_status_change(
         old_status: Previous status
         new_status: New status
         status_info: Full status info from TMDB
+        pending: If given, queue the notification here for a bulk insert instead
     """
-    try:
-        if new_status == "Ended":
-            # Series finale notification
-            last_episode = status_info.get("last_episode_to_air", {})
-            last_air_date = status_info.get("last_air_date", "Unknown")
-
-            title = f"🎭 Series Finale: {show_title}"
-            message = f"{show_title} has ended. The final episode aired on {last_air_date}."
-
-            if last_episode:
-                season = last_episode.get("season_number")
-                episode = last_episode.get("episode_number")
-                if season and episode:
-                    message += f" (S{season}E{episode})"
-
-            notifications.create_notification(
-                client=client,
-                user_id=user_id,
-                notification_type="series_finale",
-                title=title,
-                message=message,
-                related_show_id=tmdb_id,
-                related_show_title=show_title,
-                send_email=False  # bell only; weekly newsletter is the email surface
-            )
-
-            logger.info(f"Sent series finale notification for {show_title}")
+    if new_status == "Ended":
+        # Series finale notification
+        last_episode = status_info.get("last_episode_to_air", {})
+        last_air_date = status_info.get("last_air_date", "Unknown")
+
+        title = f"🎭 Series Finale: {show_title}"
+        message = f"{show_title} has ended. The final episode aired on {last_air_date}."
+
+        if last_episode:
+            season = last_episode.get("season_number")
+            episode = last_episode.get("episode_number")
+            if season and episode:
+                message += f" (S{season}E{episode})"
+
+        _create_or_queue(  # bell only; weekly newsletter is the email surface
+            client,
+            pending,
+            user_id=user_id,
+            notification_type="series_finale",
+            title=title,
+            message=message,
+            related_show_id=tmdb_id,
+            related_show_title=show_title
+        )
 
-        elif new_status == "Canceled":
-            # Cancellation notification
-            num_seasons = status_info.get("number_of_seasons", 0)
+        logger.info("Sent series finale notification for %s", show_title)
 
-            title = f"❌ Show Canceled: {show_title}"
-            message = f"{show_title} has been canceled after {num_seasons} season{'s' if num_seasons != 1 else ''}."
+    elif new_status == "Canceled":
+        # Cancellation notification
+        num_seasons = status_info.get("number_of_seasons", 0)
 
-            notifications.create_notification(
-                client=client,
-                user_id=user_id,
-                notification_type="series_cancelled",
-                title=title,
-                message=message,
-                related_show_id=tmdb_id,
-                related_show_title=show_title,
-                send_email=False  # bell only; weekly newsletter is the email surface
-            )
+        title = f"❌ Show Canceled: {show_title}"
+        message = f"{show_title} has been canceled after {num_seasons} season{'s' if num_seasons != 1 else ''}."
 
-            logger.info(f"Sent cancellation notification for {show_title}")
+        _create_or_queue(  # bell only; weekly newsletter is the email surface
+            client,
+            pending,
+            user_id=user_id,
+            notification_type="series_cancelled",
+            title=title,
+            message=message,
+            related_show_id=tmdb_id,
+            related_show_title=show_title
+        )
 
-    except Exception as e:
-        logger.error(f"Error sending status change notification: {e}")
+        logger.info("Sent cancellation notification for %s", show_title)
 
 
 def check_all_shows_status(client: Client, user_id: str) -> Dict[str, int]:
@@ -301,77 +610,281 @@ def check_all_shows_status(client: Client, user_id: str) -> Dict[str, int]:
         Dictionary with counts of updated, unchanged, and errors
     """
     try:
-        # Get all shows for user
+        # Get all shows for user, with everything _apply_status compares (one query)
         result = client.table("shows")\
-            .select("tmdb_id, title, show_status")\
+            .select(f"user_id, tmdb_id, title, {_EXISTING_COLUMNS}")\
             .eq("user_id", user_id)\
             .execute()
+    except _DB_ERRORS as e:
+        logger.error("Error checking all shows status: %s", e)
+        return {"total": 0, "updated": 0, "unchanged": 0, "errors": 1}
 
-        if not result.data:
-            return {"total": 0, "updated": 0, "unchanged": 0, "errors": 0}
+    stats = _check_rows(client, result.data or [])
+    logger.info("Status check complete for user %s: %s", user_id, stats)
+    return stats
 
-        stats = {"total": len(result.data), "updated": 0, "unchanged": 0, "errors": 0}
 
-        for show in result.data:
-            tmdb_id = show["tmdb_id"]
-            title = show["title"]
-            old_status = show.get("show_status", "Unknown")
+def check_all_users_shows_status(client: Client) -> Dict[str, int]:
+    """
+    Check status for every show on every watchlist (the nightly cron pass)
 
-            new_status = update_show_status(client, user_id, tmdb_id, title)
+    One paged query for all users' shows; each unique TMDB id is fetched once
+    and fanned out to every user tracking it.
+
+    Args:
+        client: Supabase client
+
+    Returns:
+        Dictionary with aggregate counts of updated, unchanged, and errors
+    """
+    try:
+        rows = paging.fetch_all(lambda: client.table("shows")
+                                .select(f"user_id, tmdb_id, title, {_EXISTING_COLUMNS}"))
+    except _DB_ERRORS as e:
+        logger.error("Error checking all users' shows status: %s", e)
+        return {"total": 0, "updated": 0, "unchanged": 0, "errors": 1}
+
+    stats = _check_rows(client, rows)
+    logger.info("Status check complete for all users: %s", stats)
+    return stats
 
-            if new_status is None:
-                stats["errors"] += 1
-            elif new_status != old_status:
-                stats["updated"] += 1
-            else:
-                stats["unchanged"] += 1
 
-        logger.info(f"Status check complete for user {user_id}: {stats}")
+def _check_rows(client: Client, rows: List[Dict]) -> Dict[str, int]:
+    """Status-check shows rows (one user's or everyone's): one TMDB fetch per
+    unique tmdb_id, one bulk write, one notifications insert."""
+    stats = {"total": len(rows), "updated": 0, "unchanged": 0, "errors": 0}
+    if not rows:
         return stats
 
-    except Exception as e:
-        logger.error(f"Error checking all shows status: {e}")
-        return {"total": 0, "updated": 0, "unchanged": 0, "errors": 1}
+    # Ended/Canceled shows essentially never change: only re-check them monthly.
+    # Skipped rows count as unchanged.
+    now = dt.datetime.now(dt.timezone.utc)
+    due = [s for s in rows
+           if s.get("show_status") not in ("Ended", "Canceled")
+           or not _checked_within(s.get("last_status_check"), _TERMINAL_RECHECK, now)]
+    stats["unchanged"] += len(rows) - len(due)
+
+    # Group by show so a title on 500 watchlists is ONE TMDB hit, not 500.
+    # TMDB fetches overlap; the DB work below stays on this thread
+    by_tmdb = defaultdict(list)
+    for s in due:
+        by_tmdb[s["tmdb_id"]].append(s)
+    tmdb_ids = list(by_tmdb)
+    if len(tmdb_ids) <= 1:
+        fetched = [fetch_show_status(t) for t in tmdb_ids]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_FETCH_WORKERS, len(tmdb_ids))) as executor:
+            fetched = list(executor.map(fetch_show_status, tmdb_ids))
+
+    # One timezone-aware check time for the whole batch
+    now_iso = now.isoformat()
+    updates, applied = [], []
+    for tmdb_id, status_info in zip(tmdb_ids, fetched):
+        for show in by_tmdb[tmdb_id]:
+            if not status_info:
+                stats["errors"] += 1
+                continue
+            update_data, enhanced = _status_update(tmdb_id, show["title"], status_info,
+                                                   now_iso=now_iso)
+            updates.append({"user_id": show["user_id"], "tmdb_id": tmdb_id, **update_data})
+            applied.append((show, status_info, enhanced["category"]))
+
+    _write_status_rows(client, updates)
+
+    # Second pass: notifications for whatever changed, queued for ONE insert
+    pending = []
+    nudged = _no_return_nudged(client, list({show["tmdb_id"] for show, _, _ in applied}))
+    for show, status_info, category in applied:
+        _notify_status_changes(client, show["user_id"], show["tmdb_id"], show["title"],
+                               status_info, show, category, pending, nudged)
+        if status_info["status"] != show.get("show_status", "Unknown"):
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+
+    if pending:
+        # Same in-app preference gate create_notification applies, one query per 200 users
+        prefs_by_user = preferences.get_preferences_bulk(
+            client, list({n["user_id"] for n in pending}))
+        notifications.create_notifications_bulk(
+            client, [n for n in pending
+                     if preferences.inapp_allowed(prefs_by_user.get(n["user_id"]),
+                                                  n["notification_type"])])
+
+    return stats
+
+
+def _no_return_nudged(client: Client, tmdb_ids: List[int]) -> Optional[set]:
+    """(user_id, tmdb_id) pairs that already have a no_return notification, for the
+    sweep's once-per-show check — 200 shows per query, paged past the 1000-row cap.
+    None on a DB error (callers then check per row)."""
+    nudged = set()
+    try:
+        for i in range(0, len(tmdb_ids), 200):
+            chunk = tmdb_ids[i:i + 200]
+            rows = paging.fetch_all(lambda: client.table("notifications")
+                                    .select("user_id, related_show_id")
+                                    .eq("notification_type", "no_return")
+                                    .in_("related_show_id", chunk))
+            nudged.update((r["user_id"], r["related_show_id"]) for r in rows)
+    except _DB_ERRORS as e:
+        logger.warning("Could not preload no-return notices: %s", e)
+        return None
+    return nudged
+
+
+def _write_status_rows(client: Client, updates: List[Dict]):
+    """Bulk-write status rows (user_id, tmdb_id + _status_update fields), 500 per
+    request via the update_show_statuses RPC, else row by row. UPDATE only — never
+    an upsert, which would re-insert shows deleted while the sweep was fetching."""
+    use_rpc = True
+    for i in range(0, len(updates), 500):
+        chunk = updates[i:i + 500]
+        if use_rpc:
+            try:
+                # One statement, one transaction (2026-10-15_update_show_statuses.sql)
+                client.rpc("update_show_statuses", {"p": chunk}).execute()
+                continue
+            except _DB_ERRORS as e:
+                # Function not created yet → per-row updates for this and later chunks
+                logger.warning("update_show_statuses RPC failed, updating row by row: %s", e)
+                use_rpc = False
+        for row in chunk:
+            fields = {k: v for k, v in row.items() if k not in ("user_id", "tmdb_id")}
+            try:
+                _update_show_row(client, row["user_id"], row["tmdb_id"], fields)
+            except _DB_ERRORS as e:
+                logger.error("Error updating show status: %s", e)
+
+
+def _update_show_row(client: Client, user_id: str, tmdb_id: int, fields: Dict):
+    """UPDATE one shows row; retried without last_air_date if that column is missing"""
+    try:
+        client.table("shows")\
+            .update(fields)\
+            .eq("user_id", user_id)\
+            .eq("tmdb_id", tmdb_id)\
+            .execute()
+    except _DB_ERRORS as e:
+        if "last_air_date" not in fields or not _last_air_date_missing(e):
+            raise
+        client.table("shows")\
+            .update({k: v for k, v in fields.items() if k != "last_air_date"})\
+            .eq("user_id", user_id)\
+            .eq("tmdb_id", tmdb_id)\
+            .execute()
 
 
-def is_series_finale(client: Client, user_id: str, tmdb_id: int, air_date: str) -> bool:
+def is_series_finale(client: Client, user_id: str, tmdb_id: int, air_date: str,
+                     force_refresh: bool = False) -> bool:
     """
     Check if an airing episode is a series finale
 
+    Answers from the stored show row; if its status is more than a day old, a
+    refresh is queued in the background instead of waiting on TMDB.
+
     Args:
         client: Supabase client
         user_id: User ID
         tmdb_id: TMDB show ID
         air_date: Episode air date
+        force_refresh: Bypass the TMDB status cache
 
     Returns:
         True if this is the series finale, False otherwise
     """
     try:
-        # Get show status
-        result = client.table("shows")\
-            .select("show_status")\
+        result = _finale_row(client, user_id, tmdb_id)
+    except _DB_ERRORS as e:
+        logger.error("Error checking if series finale: %s", e)
+        return False
+
+    row = result.data if result else None
+    if not row:
+        return False
+    _refresh_if_stale(client, user_id, tmdb_id, row)
+
+    status = row.get("show_status", "Unknown")
+
+    # If show is Ended, check if this is the last episode
+    if status in ["Ended", "Canceled"]:
+        last_air_date = row.get("last_air_date")
+        if last_air_date is None or force_refresh:
+            # Row predates the last_air_date column → ask TMDB (cached)
+            status_info = fetch_show_status(tmdb_id, force_refresh=force_refresh)
+            last_air_date = status_info.get("last_air_date") if status_info else None
+        return last_air_date == air_date
+
+    return False
+
+
+def _finale_row(client: Client, user_id: str, tmdb_id: int):
+    """The shows-row columns is_series_finale answers from (last_air_date if present)"""
+    columns = "title, show_status, last_status_check"
+
+    def query(cols):
+        return client.table("shows")\
+            .select(cols)\
             .eq("user_id", user_id)\
             .eq("tmdb_id", tmdb_id)\
+            .limit(1)\
+            .maybe_single()\
             .execute()
 
-        if not result.data:
-            return False
+    if _has_last_air_date:
+        try:
+            return query(columns + ", last_air_date")
+        except _DB_ERRORS as e:
+            if not _last_air_date_missing(e):
+                raise
+    return query(columns)
 
-        status = result.data[0].get("show_status", "Unknown")
-
-        # If show is Ended, check if this is the last episode
-        if status in ["Ended", "Canceled"]:
-            status_info = fetch_show_status(tmdb_id)
-            if status_info:
-                last_air_date = status_info.get("last_air_date")
-                return last_air_date == air_date
 
+def _checked_within(checked: Optional[str], age: dt.timedelta,
+                    now: Optional[dt.datetime] = None) -> bool:
+    """True if a last_status_check timestamp is younger than `age` (naive = UTC).
+    Missing or unparseable timestamps count as stale."""
+    if not checked:
         return False
-
-    except Exception as e:
-        logger.error(f"Error checking if series finale: {e}")
+    try:
+        checked_at = dt.datetime.fromisoformat(checked)
+    except ValueError:
         return False
+    if checked_at.tzinfo is None:
+        checked_at = checked_at.replace(tzinfo=dt.timezone.utc)
+    return (now or dt.datetime.now(dt.timezone.utc)) - checked_at < age
+
+
+def _refresh_if_stale(client: Client, user_id: str, tmdb_id: int, row: Dict):
+    """Queue update_show_status in the background when the row's status check is stale"""
+    if _checked_within(row.get("last_status_check"), _REFRESH_AFTER):
+        return
+
+    key = (user_id, tmdb_id)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def _run():
+        try:
+            update_show_status(client, user_id, tmdb_id, row.get("title") or "")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _REFRESH_EXECUTOR.submit(_run)
+
+
+_STATUS_EMOJIS = {
+    "Returning Series": "📺",
+    "Ended": "🎭",
+    "Canceled": "❌",
+    "In Production": "🎬",
+    "Planned": "📅",
+    "Pilot": "🚀",
+    "Unknown": "❓"
+}
 
 
 def get_show_status_emoji(status: str) -> str:
@@ -384,13 +897,4 @@ def get_show_status_emoji(status: str) -> str:
     Returns:
         Emoji representing the status
     """
-    status_emojis = {
-        "Returning Series": "📺",
-        "Ended": "🎭",
-        "Canceled": "❌",
-        "In Production": "🎬",
-        "Planned": "📅",
-        "Pilot": "🚀",
-        "Unknown": "❓"
-    }
-    return status_emojis.get(status, "❓")
+    return _STATUS_EMOJIS.get(status, "❓")
@@ -11,6 +11,10 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+LIST_PAGE_SIZE = 1000  # auth admin list_users page
+SELECT_CHUNK = 200     # ids per IN (...) lookup, keeps the URL short
+INSERT_CHUNK = 500     # rows per bulk insert
+
 def sync_auth_users():
     """Sync all authenticated users to the users table"""
     if not SUPABASE_URL or not SUPABASE_KEY:
@@ -22,9 +26,15 @@ def sync_auth_users():
 
     # Get all auth users
     try:
-        # Use admin API to list users
-        response = client.auth.admin.list_users()
-        auth_users = response
+        # Use admin API to list users (paginated — one call only returns the first page)
+        auth_users = []
+        page = 1
+        while True:
+            batch = client.auth.admin.list_users(page=page, per_page=LIST_PAGE_SIZE)
+            auth_users.extend(batch)
+            if len(batch) < LIST_PAGE_SIZE:
+                break
+            page += 1
 
         if not auth_users:
             print("⚠️  No authenticated users found")
@@ -36,35 +46,41 @@ def sync_auth_users():
         print(f"❌ Error fetching auth users: {e}")
         return False
 
-    # Sync each user to users table
+    # Which users already have a row: one IN lookup per chunk, not one SELECT per user
     synced = 0
     errors = 0
 
-    for user in auth_users:
-        try:
-            user_id = user.id
-            email = user.email
-
-            # Check if user already exists in users table
-            result = client.table("users").select("id").eq("id", user_id).execute()
-
-            if result.data:
-                print(f"  ⏭️  User already exists: {email}")
-                continue
-
-            # Insert into users table
-            client.table("users").insert({
-                "id": user_id,
-                "email": email,
-                "username": email.split('@')[0]  # Use email prefix as username
-            }).execute()
+    auth_ids = [u.id for u in auth_users]
+    existing = set()
+    try:
+        for i in range(0, len(auth_ids), SELECT_CHUNK):
+            result = client.table("users").select("id").in_("id", auth_ids[i:i+SELECT_CHUNK]).execute()
+            existing.update(r["id"] for r in result.data or [])
+    except Exception as e:
+        print(f"❌ Error reading existing users: {e}")
+        return False
 
-            synced += 1
-            print(f"  ✅ Synced: {email}")
+    to_insert = [{
+        "id": user.id,
+        "email": user.email,
+        "username": (user.email or "user").split('@')[0]  # Email prefix; phone/anonymous users have none
+    } for user in auth_users if user.id not in existing]
 
+    # Insert the missing users in bulk
+    for i in range(0, len(to_insert), INSERT_CHUNK):
+        chunk = to_insert[i:i+INSERT_CHUNK]
+        try:
+            # A row created meanwhile (concurrent sign-up / ensure_user_record) is skipped
+            # instead of failing the whole chunk; only rows actually inserted come back
+            result = client.table("users")\
+                .upsert(chunk, on_conflict="id", ignore_duplicates=True)\
+                .execute()
+            synced += len(result.data or [])
+            for row in result.data or []:
+                print(f"  ✅ Synced: {row['email']}")
         except Exception as e:
-            errors += 1
-            print(f"  ❌ Error syncing {email}: {e}")
+            errors += len(chunk)
+            print(f"  ❌ Error syncing {len(chunk)} user(s) ({chunk[0]['email']}…): {e}")
 
     print(f"\n{'='*50}")
     print(f"✅ Sync complete!")
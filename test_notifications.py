@@ -40,60 +40,47 @@ def test_notifications():
         print(f"❌ Error finding user: {e}")
         return False
 
-    # Create test notifications
+    # Create test notifications — all four in ONE bulk insert
     print("🔔 Creating test notifications...\n")
 
-    # Test 1: New episode notification
-    print("1. Creating 'New Episode' notification...")
-    success = notifications.create_notification(
-        client=client,
-        user_id=user_id,
-        notification_type="new_episode",
-        title="New Episode Available!",
-        message="A new episode is airing today",
-        related_show_id=66732,
-        related_show_title="Stranger Things",
-        send_email=False
-    )
-    print(f"   {'✅ Created' if success else '❌ Failed'}")
-
-    # Test 2: Show added notification
-    print("\n2. Creating 'Show Added' notification...")
-    success = notifications.create_notification(
-        client=client,
-        user_id=user_id,
-        notification_type="status_change",
-        title="Show Status Changed",
-        message="The Office has been added to your watchlist.",
-        related_show_id=2316,
-        related_show_title="The Office",
-        send_email=False
-    )
-    print(f"   {'✅ Created' if success else '❌ Failed'}")
-
-    # Test 3: Reminder notification
-    print("\n3. Creating 'Reminder' notification...")
-    success = notifications.create_notification(
-        client=client,
-        user_id=user_id,
-        notification_type="reminder",
-        title="Don't forget to watch!",
-        message="You have 3 shows airing this week",
-        send_email=False
-    )
-    print(f"   {'✅ Created' if success else '❌ Failed'}")
-
-    # Test 4: System notification
-    print("\n4. Creating 'System' notification...")
-    success = notifications.create_notification(
-        client=client,
-        user_id=user_id,
-        notification_type="system",
-        title="Welcome to Notifications!",
-        message="StreamGenie now has in-app notifications. Stay updated on your favorite shows!",
-        send_email=False
-    )
-    print(f"   {'✅ Created' if success else '❌ Failed'}")
+    samples = [
+        ("New Episode", {
+            "user_id": user_id,
+            "notification_type": "new_episode",
+            "title": "New Episode Available!",
+            "message": "A new episode is airing today",
+            "related_show_id": 66732,
+            "related_show_title": "Stranger Things"
+        }),
+        ("Show Added", {
+            "user_id": user_id,
+            "notification_type": "status_change",
+            "title": "Show Status Changed",
+            "message": "The Office has been added to your watchlist.",
+            "related_show_id": 2316,
+            "related_show_title": "The Office"
+        }),
+        ("Reminder", {
+            "user_id": user_id,
+            "notification_type": "reminder",
+            "title": "Don't forget to watch!",
+            "message": "You have 3 shows airing this week"
+        }),
+        ("System", {
+            "user_id": user_id,
+            "notification_type": "system",
+            "title": "Welcome to Notifications!",
+            "message": "StreamGenie now has in-app notifications. Stay updated on your favorite shows!"
+        }),
+    ]
+
+    for i, (label, _) in enumerate(samples, 1):
+        print(f"{i}. Creating '{label}' notification...")
+
+    created = notifications.create_notifications_bulk(client, [row for _, row in samples])
+    skipped = len(samples) - created
+    print(f"\n   ✅ Created {created} of {len(samples)}"
+          + (f" ({skipped} already existed)" if skipped else ""))
 
     # Get notification count
     print("\n" + "="*50)